@@ -2,70 +2,329 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from scrapers.event_scraper import EventScraper
 from scrapers.location_scraper import LocationScraper
+from scrapers.page_cache import page_validators
 import json
 import os
+import queue
+import re
+import threading
+import time
 import cache
+import compression
+import event_index
 from venue_store import venue_store
+from event_store import event_store
+from artist_index import artist_index
+from city_index import CityIndex, DEFAULT_LIMIT as CITY_SEARCH_LIMIT
+from prewarmer import CachePrewarmer, PREWARM_ENABLED
+from cache_janitor import CacheJanitor, CACHE_JANITOR_ENABLED
 
 app = Flask(__name__)
 # ...
 
+def _fetch_locations(city, force=False):
+    # Another request may have filled the cache while we were queued
+    cached = None if force else cache.get_cached_data("loc", city)
+    if cached:
+        return cached
+
+    print(f"Scraping locations for {city}...")
+    scraper = LocationScraper()
+    scraped_venues = scraper.get_locations(city)
+    if scraped_venues:
+        cache.save_to_cache("loc", city, scraped_venues)
+    return scraped_venues
+
+def _fetch_events(city, force=False, on_page=None):
+    # Another request may have filled the cache while we were queued
+    cached = None if force else cache.get_cached_data("evt", city)
+    if cached:
+        return cached
+
+    # The event store may hold a recent crawl (cache cleared, written by another worker)
+    crawl_age = event_store.get_crawl_age(city)
+    if not force and crawl_age is not None and crawl_age <= cache.CACHE_SOFT_TTL:
+        print(f"Serving events for {city} from EVENT STORE")
+        events = event_store.get_events(city)
+    else:
+        print(f"Scraping events for {city}...")
+        scraper = EventScraper()
+        scraped = scraper.get_events(city, on_page=on_page)
+
+        # Update Venue History
+        venue_store.add_venues_from_events(city, scraped)
+
+        # Only the deltas are written; the answer is read back from the store
+        if scraped:
+            event_store.upsert_events(city, scraped)
+            events = event_store.get_events(city)
+        else:
+            events = scraped
+
+    # Cache result (indexed after saving, so the index is not older than the entry)
+    if events:
+        cache.save_to_cache("evt", city, events)
+        artist_index.update_city(city, events)
+    return events
+
 @app.route('/api/locations', methods=['GET'])
 def get_locations():
     city = request.args.get('city', 'sibiu')
+    prewarmer.record_request(city)
     
-    # 1. Get Persistent Venues (History)
-    persistent_venues = venue_store.get_venues(city) if city != 'all' else venue_store.get_venues('_global')
+    # 1. Check cache for Scraped Venues (stale entries are refreshed in background)
+    scraped_venues, cache_status = cache.get_or_fetch("loc", city, lambda: _fetch_locations(city))
+    if cache_status != 'refetched':
+        print(f"Serving locations for {city} from CACHE ({cache_status})")
+    scraped_venues = scraped_venues or []
 
-    # 2. Check cache for Scraped Venues
-    cached = cache.get_cached_data("loc", city)
-    scraped_venues = []
-    
-    if cached:
-        print(f"Serving locations for {city} from CACHE")
-        scraped_venues = cached
-    else:
-        print(f"Scraping locations for {city}...")
-        scraper = LocationScraper()
-        scraped_venues = scraper.get_locations(city)
-        if scraped_venues:
-            cache.save_to_cache("loc", city, scraped_venues)
-
-    # 3. Merge Unique
-    # Convert persistent to dict by name for easy merge
-    merged_map = {v['name'].lower(): v for v in persistent_venues}
-    # Update with scraped (usually fresher URLs) or keep persistent? 
-    # Let's trust persistent but allow scraped to add new ones.
-    for v in scraped_venues:
-        if v['name'].lower() not in merged_map:
-            merged_map[v['name'].lower()] = v
-    
-    final_locations = sorted(merged_map.values(), key=lambda x: x['name'])
-    return jsonify(final_locations)
+    # 2. Merge with Persistent Venues (History): trust persistent, scraped only
+    # add venues the normalized venue index doesn't already know
+    final_locations = venue_store.merge_venues(city if city != 'all' else '_global', scraped_venues)
+    response = jsonify(final_locations)
+    response.headers['X-Cache-Status'] = cache_status
+    return _send_json(response)
 
 @app.route('/api/events', methods=['GET'])
 def get_events():
     city = request.args.get('city', 'sibiu')
+    prewarmer.record_request(city)
 
-    # Check cache
-    cached = cache.get_cached_data("evt", city)
-    if cached:
-        print(f"Serving events for {city} from CACHE")
-        return jsonify(cached)
+    stream = _stream_format()
+    queried = any(request.args.get(p) for p in EVENT_QUERY_PARAMS)
 
-    print(f"Scraping events for {city}...")
-    scraper = EventScraper()
-    events = scraper.get_events(city)
-    
-    # Update Venue History
-    venue_store.add_venues_from_events(city, events)
-    
-    # Cache result
-    if events:
-        cache.save_to_cache("evt", city, events)
-        
-    return jsonify(events)
-CORS(app)
+    # Check cache (stale entries are served and refreshed in background).
+    # Hits come back as already-serialized (and compressed) JSON, so no decode/re-encode here.
+    entry, cache_status = cache.lookup_response("evt", city, lambda: _fetch_events(city))
+    if entry is None and stream and not queried:
+        # Miss: send each page's events as the crawl completes it
+        print(f"Streaming events for {city} while scraping...")
+        return _stream_response(_stream_events(_crawl_pages(city), stream), stream, 'refetched')
+    if entry is None:
+        entry, cache_status = cache.get_or_fetch_response("evt", city, lambda: _fetch_events(city))
+    if cache_status != 'refetched':
+        print(f"Serving events for {city} from CACHE ({cache_status})")
+
+    # Range / pagination / projection parameters are answered from the start_date index
+    if queried or stream == 'ndjson':
+        try:
+            query = _parse_event_query(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        index = event_index.get_index(cache.get_cache_key("evt", city), entry)
+        events, next_cursor = index.query(
+            query['from'], query['to'], query['standup_only'], query['cursor'], query['limit'])
+        if query['fields']:
+            events = [{k: e.get(k) for k in query['fields']} for e in events]
+
+        if stream == 'ndjson':
+            response = _stream_response(_stream_events(_batches(events), stream), stream, cache_status)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+            return response
+        response = jsonify(events)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        entry = None
+    else:
+        # The body is set by _send_json once the encoding is known
+        response = app.response_class(mimetype='application/json')
+
+    response.headers['X-Cache-Status'] = cache_status
+    return _send_json(response, entry)
+
+@app.route('/api/events/stream', methods=['GET'])
+def stream_events():
+    """
+    Server-Sent Events: an 'events' message with each listing page's events as
+    soon as the crawl has it (or the cached list in batches), then a 'done'
+    message with the totals. Takes the from / to / standup_only / fields
+    parameters of /api/events.
+    """
+    city = request.args.get('city', 'sibiu')
+    prewarmer.record_request(city)
+    try:
+        query = _parse_event_query(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    entry, cache_status = cache.lookup_response("evt", city, lambda: _fetch_events(city))
+    if entry is not None:
+        print(f"Serving events for {city} from CACHE ({cache_status})")
+        index = event_index.get_index(cache.get_cache_key("evt", city), entry)
+        events, _ = index.query(query['from'], query['to'], query['standup_only'])
+        batches = _batches(_project(events, query['fields']))
+    else:
+        print(f"Streaming events for {city} while scraping...")
+        cache_status = 'refetched'
+        batches = (_project(_select(page, query), query['fields']) for page in _crawl_pages(city))
+    return _stream_response(_sse_messages(batches, cache_status), 'sse', cache_status)
+
+STREAM_BATCH_SIZE = 100  # events per chunk when streaming a list we already have
+
+def _batches(events):
+    return (events[i:i + STREAM_BATCH_SIZE] for i in range(0, len(events), STREAM_BATCH_SIZE))
+
+def _select(events, query):
+    """The events of a page that the from / to / standup_only filters keep, like EventIndex.query."""
+    start, end = query['from'] or '', (query['to'] + '\uffff') if query['to'] else None
+    return [e for e in events
+            if (e.get('start_date') or '') >= start
+            and (end is None or (e.get('start_date') or '') < end)
+            and (e.get('is_standup') or not query['standup_only'])]
+
+def _project(events, fields):
+    return [{k: e.get(k) for k in fields} for e in events] if fields else events
+
+def _stream_format():
+    """'ndjson' (?format=ndjson or Accept: application/x-ndjson), 'json' (?stream=1) or None."""
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        return 'ndjson'
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return 'json'
+    return None
+
+def _crawl_pages(city):
+    """
+    Yields lists of events as the crawl of a city completes its pages. The crawl
+    runs in its own thread under single_flight, so a client that disconnects does
+    not cancel it and concurrent requests still share one crawl; a request that
+    joins another one's crawl gets the whole list when it ends.
+    """
+    pages = queue.Queue()
+    streamed = threading.Event()
+
+    def on_page(events):
+        streamed.set()
+        pages.put(events)
+
+    def crawl():
+        try:
+            events = cache.single_flight("evt", city, lambda: _fetch_events(city, on_page=on_page))
+            if not streamed.is_set():
+                pages.put(events or [])
+        except Exception as e:
+            print(f"Streaming crawl failed for {city}: {e}")
+        finally:
+            pages.put(None)
+
+    threading.Thread(target=crawl, name=f"crawl-{city}", daemon=True).start()
+    while True:
+        events = pages.get()
+        if events is None:
+            return
+        yield events
+
+def _stream_events(batches, stream):
+    """Serializes batches of events as they come: NDJSON lines, or one JSON array written piece by piece."""
+    if stream == 'ndjson':
+        for events in batches:
+            if events:
+                yield ''.join(json.dumps(e) + '\n' for e in events)
+        return
+    yield '['
+    first = True
+    for events in batches:
+        if not events:
+            continue
+        chunk = ', '.join(json.dumps(e) for e in events)
+        yield chunk if first else ', ' + chunk
+        first = False
+    yield ']'
+
+def _sse_messages(batches, cache_status):
+    """Server-Sent Events for batches of events, closed by a 'done' message with the totals."""
+    started = time.time()
+    total = messages = 0
+    for events in batches:
+        if not events:
+            continue
+        total += len(events)
+        messages += 1
+        yield f"event: events\ndata: {json.dumps(events)}\n\n"
+    done = {"events": total, "messages": messages, "cache": cache_status,
+            "elapsed": round(time.time() - started, 2)}
+    yield f"event: done\ndata: {json.dumps(done)}\n\n"
+
+STREAM_MIMETYPES = {'json': 'application/json', 'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+
+def _stream_response(chunks, stream, cache_status):
+    """
+    A chunked response written as chunks are produced, so the first events go
+    out before the whole list exists. Not conditional or compressed: the body
+    is not known up front.
+    """
+    response = app.response_class(chunks, mimetype=STREAM_MIMETYPES[stream])
+    response.headers['X-Cache-Status'] = cache_status
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # proxies pass chunks on as they come
+    return response
+
+def _send_json(response, entry=None):
+    """
+    Makes a JSON response conditional and compressed. It gets a content-hash
+    ETag, so a matching If-None-Match is answered with a bodyless 304; other
+    clients get the best Content-Encoding they accept. Cache entries come with
+    ETag and compressed bodies precomputed; anything else is hashed here and
+    compressed once per distinct body.
+    """
+    if entry is not None:
+        etag = entry.etag
+    else:
+        body = response.get_data()
+        etag = compression.compute_etag(body)
+
+    # Same bytes whatever the encoding, hence a weak validator
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+
+    # Only bodies that are actually sent get compressed
+    encoded = entry.encoded if entry is not None else compression.recent_bodies.get(etag, body)
+    encoding = request.accept_encodings.best_match([e for e in compression.ENCODINGS if e in encoded])
+    if entry is not None:
+        # Large entries are views of the mapped cache file, streamed a chunk at a time
+        response.response = entry.chunks(encoding)
+        response.content_length = entry.length(encoding)
+    elif encoding:
+        response.set_data(encoded[encoding])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+EVENT_QUERY_PARAMS = ('from', 'to', 'limit', 'cursor', 'standup_only', 'fields')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+MAX_LIMIT = 1000
+
+def _parse_event_query(args):
+    """Validates the /api/events query parameters. Raises ValueError with a readable message."""
+    query = {}
+    for name in ('from', 'to'):
+        value = args.get(name) or None
+        if value and not DATE_RE.match(value):
+            raise ValueError(f"'{name}' must be a date like 2026-03-01")
+        query[name] = value
+
+    limit = args.get('limit')
+    if limit:
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_LIMIT:
+            raise ValueError(f"'limit' must be between 1 and {MAX_LIMIT}")
+        query['limit'] = int(limit)
+    else:
+        query['limit'] = None
+
+    cursor = args.get('cursor')
+    query['cursor'] = event_index.decode_cursor(cursor) if cursor else None
+    query['standup_only'] = args.get('standup_only', '').lower() in ('1', 'true', 'yes')
+    fields = args.get('fields')
+    query['fields'] = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    return query
+
+CORS(app, expose_headers=['X-Cache-Status', 'X-Next-Cursor'])
 
 # Load cities
 CITIES_FILE = os.path.join(os.path.dirname(__file__), 'cities.json')
@@ -73,20 +332,95 @@ ALL_CITIES = []
 if os.path.exists(CITIES_FILE):
     with open(CITIES_FILE, 'r', encoding='utf-8') as f:
         ALL_CITIES = json.load(f)
+city_index = CityIndex(ALL_CITIES)
+
+# Keeps the hottest cities warm so requests for them don't scrape inline
+prewarmer = CachePrewarmer(ALL_CITIES, {
+    "evt": lambda city: _fetch_events(city, force=True),
+    "loc": lambda city: _fetch_locations(city, force=True),
+})
+if PREWARM_ENABLED:
+    prewarmer.start()
+
+# Keeps cache_data under its size / entry caps
+janitor = CacheJanitor()
+if CACHE_JANITOR_ENABLED and cache.backend.name == 'file':
+    janitor.start()
+
+# Artist index starts from what the event store already knows
+for _city in event_store.crawled_cities():
+    artist_index.update_city(_city, event_store.get_events(_city))
+
+def _index_artists(city):
+    """
+    Makes sure the artist index holds the city's latest stored listing. The
+    index is per worker, so a city crawled by another worker is loaded here
+    from the event store or the cache. Never scrapes: a city nobody crawled yet
+    has no artists until a crawl or the prewarmer stores its events.
+    """
+    now = time.time()
+    cache_age = cache.get_cache_age("evt", city)
+    crawl_age = event_store.get_crawl_age(city)
+    cached_at = now - cache_age if cache_age is not None else None
+    crawled_at = now - crawl_age if crawl_age is not None else None
+    indexed_at = artist_index.indexed_at(city)
+    if indexed_at is not None and all(t is None or t <= indexed_at for t in (cached_at, crawled_at)):
+        return
+
+    events = None
+    if cached_at is not None and (crawled_at is None or cached_at >= crawled_at):
+        events, _ = cache.get_cached_entry("evt", city)
+    if events is None and crawled_at is not None:
+        events = event_store.get_events(city)
+    if events is not None:
+        artist_index.update_city(city, events)
+
+@app.route('/api/artists', methods=['GET'])
+def search_artists():
+    query = request.args.get('q', '')
+    city = request.args.get('city') or None
+    limit = request.args.get('limit', type=int)
+    if city:
+        prewarmer.record_request(city)
+        _index_artists(city)
+    return _send_json(jsonify(artist_index.search(query, city, limit)))
 
 @app.route('/api/search_cities', methods=['GET'])
 def search_cities():
-    query = request.args.get('q', '').lower().strip()
-    if not query or query == 'all':
-        return jsonify(ALL_CITIES)
-    
-    matches = [c for c in ALL_CITIES if query in c['name'].lower()]
-    return jsonify(matches)
+    query = request.args.get('q', '').strip()
+    # The city selector loads the full list once with q=all
+    if query.lower() == 'all':
+        return _send_json(jsonify(ALL_CITIES))
+
+    limit = request.args.get('limit', CITY_SEARCH_LIMIT, type=int)
+    if limit < 1:
+        limit = CITY_SEARCH_LIMIT
+    return _send_json(jsonify(city_index.search(query, limit)))
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats_endpoint():
+    stats = cache.get_stats()
+    stats["prewarm"] = prewarmer.stats()
+    stats["janitor"] = janitor.stats()
+    stats["crawls"] = list(EventScraper.recent_reports)
+    stats["pages"] = page_validators.get_stats()
+    stats["store"] = event_store.stats()
+    stats["venues"] = venue_store.stats()
+    stats["artists"] = artist_index.stats()
+    return _send_json(jsonify(stats))
 
 @app.route('/api/cache', methods=['DELETE'])
 def clear_cache_endpoint():
+    # ?prefix=evt|loc and/or ?city=... only drop those entries; no parameters clears everything
+    prefix = request.args.get('prefix') or None
+    city = request.args.get('city') or None
+    if prefix and not prefix.isalnum():
+        return jsonify({"status": "error", "message": "'prefix' must be a cache prefix like evt or loc"}), 400
     try:
-        count = cache.clear_all_cache()
+        count = cache.invalidate(prefix, city) if prefix or city else cache.clear_all_cache()
+        if prefix in (None, 'evt'):
+            # Otherwise _fetch_events would answer from the event store's last crawl instead of rescraping
+            event_store.expire_crawls(city)
         return jsonify({"status": "success", "deleted_files": count})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
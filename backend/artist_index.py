@@ -0,0 +1,106 @@
+import re
+import time
+import threading
+from bisect import bisect_left
+
+from text_utils import fold
+
+# Same rule the frontend used on event titles: the name after "cu" / "show" /
+# "featuring" / "starring", shorter than 25 characters.
+ARTIST_RE = re.compile(r'(?:cu|show|featuring|starring)\s+([A-ZĂÂÎȘȚ][a-zA-Zăâîșț\s&-]+)', re.I)
+MAX_ARTIST_LENGTH = 25
+
+def extract_artist(title):
+    if not title:
+        return None
+    match = ARTIST_RE.search(title)
+    if not match:
+        return None
+    name = match.group(1).strip()
+    return name if len(name) < MAX_ARTIST_LENGTH else None
+
+def event_artist(event):
+    # Events scraped before the 'artist' field existed get it from the title
+    if 'artist' in event:
+        return event['artist']
+    return extract_artist(event.get('title'))
+
+class ArtistIndex:
+    """
+    Artist -> event counts per city listing, updated whenever a city is crawled.
+    Supports diacritic-insensitive prefix search.
+    """
+    def __init__(self):
+        self._by_city = {}  # city -> {artist: set(event urls)}
+        self._artists = {}  # artist -> {city: count}
+        self._totals = {}  # artist -> distinct events across all listings
+        self._sorted = []  # [(folded name, artist)]
+        self._indexed_at = {}  # city -> when its listing was indexed
+        self._lock = threading.Lock()
+
+    def update_city(self, city, events):
+        artists = {}
+        for e in events:
+            name = event_artist(e)
+            if name:
+                artists.setdefault(name, set()).add(e.get('url') or e.get('title'))
+        with self._lock:
+            self._by_city[city] = artists
+            self._indexed_at[city] = time.time()
+            self._rebuild()
+
+    def indexed_at(self, city):
+        """When the city's listing was last indexed (in this process), or None."""
+        with self._lock:
+            return self._indexed_at.get(city)
+
+    def _rebuild(self):
+        per_artist = {}
+        urls = {}
+        for city, artists in self._by_city.items():
+            for name, event_urls in artists.items():
+                per_artist.setdefault(name, {})[city] = len(event_urls)
+                urls.setdefault(name, set()).update(event_urls)
+        self._artists = per_artist
+        self._totals = {name: len(u) for name, u in urls.items()}
+        self._sorted = sorted((fold(name), name) for name in per_artist)
+
+    def search(self, prefix='', city=None, limit=None):
+        """
+        Artists whose name (or any word of it) starts with prefix, alphabetically.
+        With a city, only artists listed there and only that city's count.
+        """
+        folded = fold(prefix.strip())
+        with self._lock:
+            if folded:
+                start = bisect_left(self._sorted, (folded,))
+                names = []
+                for key, name in self._sorted[start:]:
+                    if not key.startswith(folded):
+                        break
+                    names.append(name)
+                # Also match later words ("micutzu" finds "Teo si Micutzu")
+                names += [name for key, name in self._sorted
+                          if not key.startswith(folded) and any(w.startswith(folded) for w in key.split()[1:])]
+                names.sort(key=fold)
+            else:
+                names = [name for _, name in self._sorted]
+
+            results = []
+            for name in names:
+                cities = self._artists[name]
+                if city:
+                    if city not in cities:
+                        continue
+                    results.append({"name": name, "events": cities[city], "cities": {city: cities[city]}})
+                else:
+                    results.append({"name": name, "events": self._totals[name], "cities": dict(cities)})
+                if limit and len(results) >= limit:
+                    break
+            return results
+
+    def stats(self):
+        with self._lock:
+            return {"artists": len(self._artists), "cities": len(self._by_city)}
+
+artist_index = ArtistIndex()
@@ -2,56 +2,511 @@ import json
 import os
 import time
 import hashlib
+import threading
+import concurrent.futures
+from collections import OrderedDict
+
+import cache_codec
+from compression import compute_etag, encode_body
+from cache_backends import CACHE_BACKEND, create_backend
 
 CACHE_DIR = "backend/cache_data"
 CACHE_DURATION = 3600  # 1 hour
 
+# Stale-while-revalidate window:
+# - younger than SOFT_TTL -> fresh, served as is
+# - between SOFT_TTL and HARD_TTL -> stale, served immediately and refreshed in background
+# - older than HARD_TTL -> treated as missing
+CACHE_SOFT_TTL = int(os.environ.get("CACHE_SOFT_TTL", CACHE_DURATION))
+CACHE_HARD_TTL = int(os.environ.get("CACHE_HARD_TTL", 24 * 3600))
+REFRESH_WORKERS = 2
+
+# How entries are stored: 'json', or 'compact' for column-encoded event and
+# venue lists (see cache_codec). Both are read whatever this is set to.
+CACHE_FORMAT = os.environ.get("CACHE_FORMAT", "json")
+
+# How long another node may hold a key's fetch lock (shared backends only)
+# before the nodes waiting on it give up and fetch themselves
+FETCH_LOCK_TTL = int(os.environ.get("CACHE_FETCH_LOCK_TTL", 120))
+
+# In-process memory tier in front of the backend (serialized JSON bytes)
+MEMORY_CACHE_MAX_BYTES = int(os.environ.get("MEMORY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# How long a memory copy is served before checking that the backend still holds
+# it (another worker or node may have invalidated or replaced it). Hits in
+# between are a dict lookup; invalidations reach other workers within this.
+CACHE_REVALIDATE_INTERVAL = float(os.environ.get("CACHE_REVALIDATE_INTERVAL", 1.0))
+
+# Mapped bodies are written to the client in slices of this size
+STREAM_CHUNK_SIZE = 8 * 1024  # what werkzeug's FileWrapper reads per write
+
+# Single-flight state: one in-progress fetch per (prefix, key)
+_inflight = {}
+_inflight_lock = threading.Lock()
+_stats = {"coalesced": 0, "stale_served": 0, "background_refreshes": 0, "shared_waits": 0}
+
+# Background refresh state
+_refresh_executor = concurrent.futures.ThreadPoolExecutor(max_workers=REFRESH_WORKERS)
+_refreshing = set()
+
+# Last time this process served each entry (cache file name -> timestamp), for the janitor's LRU
+_last_access = {}
+
 def get_cache_key(prefix, key):
     m = hashlib.md5()
     m.update(key.encode('utf-8'))
     return f"{prefix}_{m.hexdigest()}.json"
 
-def get_cached_data(prefix, key):
-    if not os.path.exists(CACHE_DIR):
+class CachedBody:
+    """
+    A cache entry as it is served: the JSON body, its ETag and the body
+    pre-compressed for every supported Content-Encoding, all stored together
+    (see cache_codec bundles). Entries read from a mapped cache file keep every
+    part as a view of the mapping, i.e. in the OS page cache shared by all
+    workers rather than in this worker's heap. Compact entries rebuild their
+    JSON only when an uncompressed body is asked for.
+    """
+    __slots__ = ('saved_at', 'checked_at', 'etag', 'encoded', 'mapped', 'size', '_json', '_compact')
+
+    def __init__(self, saved_at, etag, encoded, json_body=None, compact=None, mapped=False):
+        self.saved_at = saved_at
+        self.checked_at = time.time()  # last time the backend was known to hold this entry
+        self.etag = etag
+        self.encoded = encoded
+        self.mapped = mapped
+        self._json = json_body
+        self._compact = compact
+        # A mapped entry lives in the page cache, not in our heap
+        self.size = 0 if mapped else sum(len(part) for part in (json_body, compact, *encoded.values()) if part is not None)
+
+    @classmethod
+    def from_json(cls, body, saved_at):
+        """An entry for JSON bytes, hashed and compressed here."""
+        return cls(saved_at, compute_etag(body), encode_body(body), json_body=body)
+
+    @classmethod
+    def from_stored(cls, stored, saved_at):
+        """
+        An entry for what the backend returned: a bundle, or a plain JSON or
+        compact body written before bundles. Raises ValueError if it is corrupt.
+        """
+        mapped = not isinstance(stored, bytes)
+        if not cache_codec.is_bundle(stored):
+            body = json.dumps(cache_codec.decode_compact(stored)).encode('utf-8') if cache_codec.is_compact(stored) else stored
+            if mapped and body is stored:
+                # Compressing it here would put the copies in our heap; rewritten as a bundle on the next refresh
+                return cls(saved_at, compute_etag(body), {}, json_body=memoryview(body), mapped=True)
+            return cls.from_json(bytes(body), saved_at)
+
+        etag, parts = cache_codec.decode_bundle(stored)
+        if not mapped:
+            parts = {name: part.tobytes() for name, part in parts.items()}
+        encoded = {name: part for name, part in parts.items() if name not in ('json', 'compact')}
+        return cls(saved_at, etag, encoded, json_body=parts.get('json'), compact=parts.get('compact'), mapped=mapped)
+
+    @property
+    def body(self):
+        """The JSON bytes (a view of the mapping for mapped entries)."""
+        if self._json is None:
+            self._json = json.dumps(cache_codec.decode_compact(self._compact)).encode('utf-8')
+        return self._json
+
+    def data(self):
+        """The cached data, decoded straight from the stored payload."""
+        if self._json is None:
+            return cache_codec.decode_compact(self._compact)
+        return json.loads(bytes(self._json) if self.mapped else self._json)
+
+    def length(self, encoding=None):
+        return len(self.encoded[encoding] if encoding else self.body)
+
+    def chunks(self, encoding=None):
+        """
+        The body (or its encoding) for a streamed response. Mapped parts go out
+        in STREAM_CHUNK_SIZE bytes copies, since WSGI servers only write bytes
+        (gunicorn raises TypeError for a memoryview): at most one chunk per
+        response is in the heap at a time, however large the entry.
+        """
+        part = self.encoded[encoding] if encoding else self.body
+        if isinstance(part, bytes):
+            yield part
+            return
+        for start in range(0, len(part), STREAM_CHUNK_SIZE):
+            yield part[start:start + STREAM_CHUNK_SIZE].tobytes()
+
+class MemoryTier:
+    """
+    Bounded LRU of CachedBody entries, keyed by get_cache_key names.
+    Evicts least recently used entries once the total size (plain and
+    compressed bodies) goes over max_bytes.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return entry
+
+    def peek(self, name):
+        """Like get, but does not touch LRU order or stats."""
+        with self._lock:
+            return self._entries.get(name)
+
+    def put(self, name, entry):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._size -= old.size
+            self._entries[name] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._size -= old.size
+                self.evictions += 1
+
+    def discard(self, name):
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._size -= old.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "mapped": sum(1 for entry in self._entries.values() if entry.mapped),
+            }
+
+memory_tier = MemoryTier(MEMORY_CACHE_MAX_BYTES)
+
+# Where entries are stored (see cache_backends); the memory tier sits in front of it
+backend = create_backend(CACHE_BACKEND, CACHE_DIR)
+
+def set_backend(new_backend):
+    """Switches the store, e.g. to a MemoryBackend or a fakeredis-backed RedisBackend in tests."""
+    global backend
+    backend = new_backend
+    memory_tier.clear()
+    _last_access.clear()
+
+def _cache_status(saved_at):
+    age = time.time() - saved_at
+    if age > CACHE_HARD_TTL:
         return None
-    
+    return 'fresh' if age <= CACHE_SOFT_TTL else 'stale'
+
+def get_cached_response(prefix, key):
+    """
+    Returns (CachedBody, status) where status is 'fresh' or 'stale'.
+    Returns (None, None) when the entry is missing or older than CACHE_HARD_TTL.
+    """
     filename = get_cache_key(prefix, key)
-    filepath = os.path.join(CACHE_DIR, filename)
-    
-    if not os.path.exists(filepath):
-        return None
-        
-    # Check if expired
-    if time.time() - os.path.getmtime(filepath) > CACHE_DURATION:
-        return None
-        
+    entry = memory_tier.get(filename)
+    if entry is not None and _cache_status(entry.saved_at) == 'fresh':
+        now = time.time()
+        if now - entry.checked_at < CACHE_REVALIDATE_INTERVAL:
+            _last_access[filename] = now
+            return entry, 'fresh'
+        # Another worker (or node) may have invalidated or replaced the entry
+        # since: a stat / HGET, not a read, at most once per interval
+        try:
+            stored_at = backend.saved_at(filename)
+        except backend.errors as e:
+            print(f"Cache read error: {e}")
+            stored_at = entry.saved_at
+        if stored_at is None:
+            memory_tier.discard(filename)
+            return None, None
+        if stored_at <= entry.saved_at:
+            entry.checked_at = now
+            _last_access[filename] = now
+            return entry, 'fresh'
+
+    # Memory copy is missing, replaced or no longer fresh: load the newer one, if any
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except:
+        stored = backend.read(filename, entry.saved_at if entry is not None else 0)
+    except backend.errors as e:
+        print(f"Cache read error: {e}")
+        stored = None
+    if stored is not None:
+        try:
+            entry = CachedBody.from_stored(*stored)
+            memory_tier.put(filename, entry)
+        except ValueError as e:
+            print(f"Corrupt cache entry {prefix}/{key}: {e}")
+    elif entry is not None:
+        # Nothing newer, but the entry may be gone altogether (stale copies only, so rare)
+        try:
+            if backend.saved_at(filename) is None:
+                memory_tier.discard(filename)
+                return None, None
+        except backend.errors as e:
+            print(f"Cache read error: {e}")
+
+    if entry is None:
+        return None, None
+    status = _cache_status(entry.saved_at)
+    if status is None:
+        memory_tier.discard(filename)
+        return None, None
+    _last_access[filename] = time.time()
+    return entry, status
+
+def get_cache_age(prefix, key):
+    """Returns the age in seconds of the stored entry, or None if there is none (e.g. it was invalidated)."""
+    filename = get_cache_key(prefix, key)
+    try:
+        saved_at = backend.saved_at(filename)
+    except backend.errors:
+        # Backend unreachable: fall back to this worker's copy
+        entry = memory_tier.peek(filename)
+        saved_at = entry.saved_at if entry is not None else None
+    if saved_at is None:
         return None
+    return time.time() - saved_at
+
+def get_cached_entry(prefix, key):
+    """
+    Returns (data, status) where status is 'fresh' or 'stale'.
+    Returns (None, None) when the entry is missing or older than CACHE_HARD_TTL.
+    """
+    entry, status = get_cached_response(prefix, key)
+    if entry is None:
+        return None, None
+    try:
+        return entry.data(), status
+    except ValueError as e:
+        print(f"Corrupt cache entry {prefix}/{key}: {e}")
+        return None, None
+
+def get_cached_data(prefix, key):
+    """Returns the cached data only while it is fresh."""
+    data, status = get_cached_entry(prefix, key)
+    return data if status == 'fresh' else None
 
 def save_to_cache(prefix, key, data):
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
+    """
+    Writes an entry to the backend. Its ETag and compressed bodies are computed
+    here, once, and stored with it, so no worker recomputes them on read.
+    """
     cache_key = get_cache_key(prefix, key)
-    filepath = os.path.join(CACHE_DIR, cache_key)
+    body = json.dumps(data).encode('utf-8')
+    entry = CachedBody.from_json(body, None)
+    compact = cache_codec.encode_compact(data) if CACHE_FORMAT == 'compact' else None
+    payload = ('compact', compact) if compact else ('json', body)
+    stored = cache_codec.encode_bundle(entry.etag, [payload] + list(entry.encoded.items()))
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f)
-    except Exception as e:
+        entry.saved_at = backend.write(cache_key, stored, CACHE_HARD_TTL)
+    except backend.errors as e:
         print(f"Cache write error: {e}")
+        return
+    memory_tier.put(cache_key, entry)
 
-def clear_all_cache():
-    count = 0
-    if not os.path.exists(CACHE_DIR):
-        return 0
-    for filename in os.listdir(CACHE_DIR):
-        file_path = os.path.join(CACHE_DIR, filename)
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+def single_flight(prefix, key, fetch):
+    """
+    Runs fetch() once per (prefix, key) at a time.
+    Concurrent callers for the same key wait for the first one and share its result.
+    """
+    flight_key = (prefix, key)
+    with _inflight_lock:
+        flight = _inflight.get(flight_key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _Flight()
+            _inflight[flight_key] = flight
+        else:
+            _stats["coalesced"] += 1
+
+    if not is_leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _fetch_shared(prefix, key, fetch)
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(flight_key, None)
+        flight.done.set()
+    return flight.result
+
+def _fetch_shared(prefix, key, fetch):
+    """
+    fetch() under the backend's lock for the key, so with a shared backend one
+    node fetches while the others wait and read its result from the cache.
+    If that node fails or takes longer than FETCH_LOCK_TTL, we fetch ourselves.
+    """
+    if not backend.shared:
+        return fetch()
+    name = get_cache_key(prefix, key)
+    try:
+        token = backend.acquire_lock(name, FETCH_LOCK_TTL)
+        if token is None and backend.wait_lock(name, FETCH_LOCK_TTL):
+            data, status = get_cached_entry(prefix, key)
+            if data and status == 'fresh':
+                with _inflight_lock:
+                    _stats["shared_waits"] += 1
+                return data
+    except backend.errors as e:
+        print(f"Cache lock error for {prefix}/{key}: {e}")
+        token = None
+
+    try:
+        return fetch()
+    finally:
+        if token is not None:
+            try:
+                backend.release_lock(name, token)
+            except backend.errors as e:
+                print(f"Cache lock error for {prefix}/{key}: {e}")
+
+def refresh_in_background(prefix, key, fetch):
+    """
+    Schedules fetch() on the background refresh pool, at most once per (prefix, key).
+    The refresh goes through single_flight so inline misses for the same key join it.
+    """
+    flight_key = (prefix, key)
+    with _inflight_lock:
+        if flight_key in _refreshing:
+            return False
+        _refreshing.add(flight_key)
+        _stats["background_refreshes"] += 1
+
+    def run():
         try:
-            if os.path.isfile(file_path):
-                os.unlink(file_path)
-                count += 1
+            single_flight(prefix, key, fetch)
         except Exception as e:
-            print(f"Error deleting {file_path}: {e}")
+            print(f"Background refresh failed for {prefix}/{key}: {e}")
+        finally:
+            with _inflight_lock:
+                _refreshing.discard(flight_key)
+
+    _refresh_executor.submit(run)
+    return True
+
+def get_or_fetch(prefix, key, fetch):
+    """
+    Stale-while-revalidate lookup.
+    Returns (data, status) with status 'fresh', 'stale' or 'refetched'.
+    """
+    data, status = get_cached_entry(prefix, key)
+    if data and status == 'stale':
+        with _inflight_lock:
+            _stats["stale_served"] += 1
+        refresh_in_background(prefix, key, fetch)
+    if data:
+        return data, status
+
+    # Concurrent misses for the same key share a single fetch
+    return single_flight(prefix, key, fetch), 'refetched'
+
+def lookup_response(prefix, key, fetch):
+    """
+    The cache half of get_or_fetch_response: (CachedBody, 'fresh' or 'stale'),
+    with fetch() scheduled in the background for stale entries, or (None, None)
+    on a miss, for callers that handle misses their own way (e.g. streaming).
+    """
+    entry, status = get_cached_response(prefix, key)
+    if entry is not None and status == 'stale':
+        with _inflight_lock:
+            _stats["stale_served"] += 1
+        refresh_in_background(prefix, key, fetch)
+    return entry, status
+
+def get_or_fetch_response(prefix, key, fetch):
+    """
+    Same as get_or_fetch, but returns the CachedBody (serialized JSON, ETag and
+    compressed variants) so cache hits skip the decode, re-encode and compression.
+    """
+    entry, status = lookup_response(prefix, key, fetch)
+    if entry is not None:
+        return entry, status
+
+    data = single_flight(prefix, key, fetch)
+    body = json.dumps(data).encode('utf-8')
+    # save_to_cache normally just put the same bytes in the memory tier
+    entry = memory_tier.peek(get_cache_key(prefix, key))
+    if entry is None or entry.body != body:
+        entry = CachedBody.from_json(body, time.time())
+    return entry, 'refetched'
+
+def get_stats():
+    with _inflight_lock:
+        return {
+            "coalesced_requests": _stats["coalesced"],
+            "inflight": len(_inflight),
+            "stale_served": _stats["stale_served"],
+            "background_refreshes": _stats["background_refreshes"],
+            "refreshing": len(_refreshing),
+            "shared_waits": _stats["shared_waits"],
+            "memory": memory_tier.stats(),
+            "backend": backend.stats(),
+        }
+
+def access_times():
+    """Snapshot of when this process last served each entry, by cache file name."""
+    return dict(_last_access)
+
+def delete_entry(filename):
+    """Removes one stored entry and its memory copy. Returns False if it was already gone."""
+    memory_tier.discard(filename)
+    _last_access.pop(filename, None)
+    return backend.delete(filename)
+
+def invalidate(prefix=None, key=None):
+    """
+    Deletes the entries of one prefix, one key (e.g. a city) under every
+    prefix, or one (prefix, key). Returns how many entries were deleted.
+    """
+    if prefix and key:
+        names = [get_cache_key(prefix, key)]
+    else:
+        suffix = get_cache_key('', key) if key else '.json'
+        names = [name for name in backend.names()
+                 if name.endswith(suffix) and (not prefix or name.startswith(prefix + '_'))]
+    count = 0
+    for name in names:
+        try:
+            count += delete_entry(name)
+        except backend.errors as e:
+            print(f"Error deleting {name}: {e}")
     return count
+
+def clear_all_cache():
+    memory_tier.clear()
+    _last_access.clear()
+    return backend.clear()
@@ -0,0 +1,325 @@
+import os
+import mmap
+import time
+import uuid
+import tempfile
+import threading
+
+try:
+    import redis
+except ImportError:  # optional: only needed for CACHE_BACKEND=redis
+    redis = None
+
+# Where serialized cache entries live:
+# - file  -> one JSON file per entry in CACHE_DIR (per node, the default)
+# - memory -> a dict in this process (tests, single-worker dev server)
+# - redis -> a Redis-protocol server shared by every worker and instance
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file")
+REDIS_URL = os.environ.get("CACHE_REDIS_URL") or os.environ.get("REDIS_URL")
+REDIS_PREFIX = os.environ.get("CACHE_REDIS_PREFIX", "cache:")
+
+# Suffix of the temp files FileBackend renames into place
+TMP_SUFFIX = ".tmp"
+
+# Files at least this big are memory-mapped rather than read into the worker's
+# heap: all workers then share the OS page cache copy. 0 turns it off; it is off
+# on Windows, where a file that is mapped cannot be replaced.
+CACHE_MMAP_MIN_BYTES = int(os.environ.get("CACHE_MMAP_MIN_BYTES", 0 if os.name == 'nt' else 256 * 1024))
+
+LOCK_POLL_INTERVAL = 0.05  # seconds between checks while another node holds a fetch lock
+
+class CacheBackend:
+    """
+    Storage for serialized cache entries, keyed by get_cache_key names.
+    Entries are (body bytes, saved_at timestamp); freshness is decided by cache.py.
+
+    Shared backends also hold the fetch locks, so that one node scrapes a key
+    while the others wait for its result. The defaults here are for
+    backends only this process sees, where cache.single_flight is enough.
+    """
+    name = None
+    shared = False
+    errors = (OSError,)  # what a failing read or write raises
+
+    def read(self, name, newer_than=0):
+        """
+        (body, saved_at) if the entry exists and was saved after newer_than, else None.
+        body is bytes or, for large files, a read-only mmap of them.
+        """
+        raise NotImplementedError
+
+    def saved_at(self, name):
+        raise NotImplementedError
+
+    def write(self, name, body, ttl):
+        """Stores an entry that may be dropped after ttl seconds. Returns its saved_at."""
+        raise NotImplementedError
+
+    def delete(self, name):
+        """Returns False if the entry was already gone."""
+        raise NotImplementedError
+
+    def names(self):
+        raise NotImplementedError
+
+    def clear(self):
+        """Deletes every entry. Returns how many there were."""
+        count = 0
+        for name in self.names():
+            count += self.delete(name)
+        return count
+
+    def acquire_lock(self, name, ttl):
+        """A token if this node may fetch the entry, None while another node is fetching it."""
+        return True
+
+    def release_lock(self, name, token):
+        pass
+
+    def wait_lock(self, name, timeout):
+        """Waits for another node's fetch. Returns False if it still holds the lock after timeout."""
+        return True
+
+    def stats(self):
+        return {"backend": self.name}
+
+class FileBackend(CacheBackend):
+    """
+    One file per entry; saved_at is the file's mtime. Large entries are read
+    as read-only mmaps: since writes rename a new file into place, a mapping
+    keeps showing the complete old entry until it is dropped.
+    """
+    name = "file"
+
+    def __init__(self, directory, mmap_min_bytes=CACHE_MMAP_MIN_BYTES):
+        self.directory = directory
+        self.mmap_min_bytes = mmap_min_bytes
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read(self, name, newer_than=0):
+        try:
+            # Files are replaced atomically: the open handle's mtime and bytes belong together
+            with open(self._path(name), 'rb') as f:
+                st = os.fstat(f.fileno())
+                if st.st_mtime <= newer_than:
+                    return None
+                if self.mmap_min_bytes and st.st_size >= self.mmap_min_bytes:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), st.st_mtime
+                return f.read(), st.st_mtime
+        except FileNotFoundError:
+            return None
+
+    def saved_at(self, name):
+        try:
+            return os.path.getmtime(self._path(name))
+        except OSError:
+            return None
+
+    def write(self, name, body, ttl):
+        """
+        Writes body to a temp file in the same directory, fsyncs it and renames it
+        over the entry, so readers (in any worker) see either the old entry or the
+        new one, never a partial file. Expired files are left to the janitor.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + name + '.', suffix=TMP_SUFFIX, dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+                mtime = os.fstat(f.fileno()).st_mtime
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        # Make the rename itself survive a crash (not possible on Windows)
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        return mtime
+
+    def delete(self, name):
+        try:
+            os.unlink(self._path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def names(self):
+        if not os.path.exists(self.directory):
+            return []
+        return [name for name in os.listdir(self.directory) if name.endswith('.json')]
+
+    def clear(self):
+        # Temp files of interrupted writes go too
+        if not os.path.exists(self.directory):
+            return 0
+        count = 0
+        for filename in os.listdir(self.directory):
+            file_path = self._path(filename)
+            try:
+                if os.path.isfile(file_path):
+                    os.unlink(file_path)
+                    count += 1
+            except Exception as e:
+                print(f"Error deleting {file_path}: {e}")
+        return count
+
+    def stats(self):
+        return {"backend": self.name, "directory": self.directory, "mmap_min_bytes": self.mmap_min_bytes}
+
+class MemoryBackend(CacheBackend):
+    """Entries in a dict of this process; expired ones are dropped when listed or read."""
+    name = "memory"
+
+    def __init__(self):
+        self._entries = {}  # name -> (body, saved_at, expires_at)
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        item = self._entries.get(name)
+        if item is not None and item[2] < time.time():
+            del self._entries[name]
+            return None
+        return item
+
+    def read(self, name, newer_than=0):
+        with self._lock:
+            item = self._get(name)
+        if item is None or item[1] <= newer_than:
+            return None
+        return item[0], item[1]
+
+    def saved_at(self, name):
+        with self._lock:
+            item = self._get(name)
+        return item[1] if item is not None else None
+
+    def write(self, name, body, ttl):
+        saved_at = time.time()
+        with self._lock:
+            self._entries[name] = (body, saved_at, saved_at + ttl)
+        return saved_at
+
+    def delete(self, name):
+        with self._lock:
+            return self._entries.pop(name, None) is not None
+
+    def names(self):
+        with self._lock:
+            return [name for name in list(self._entries) if self._get(name) is not None]
+
+    def stats(self):
+        with self._lock:
+            return {"backend": self.name, "entries": len(self._entries)}
+
+class RedisBackend(CacheBackend):
+    """
+    Entries as Redis hashes {body, saved_at} that expire after the hard TTL,
+    shared by every worker and instance pointed at the same server. Works with
+    anything speaking the Redis protocol (Redis, Valkey, fakeredis in tests).
+    Fetch locks are SET NX keys with their own expiry, so a node that dies
+    mid-fetch only blocks the others until the lock times out.
+    """
+    name = "redis"
+    shared = True
+
+    def __init__(self, client, prefix=REDIS_PREFIX):
+        self.client = client
+        self.prefix = prefix
+        self.errors = (redis.RedisError,) if redis is not None else (Exception,)
+        self.lock_waits = 0
+
+    @classmethod
+    def from_url(cls, url, prefix=REDIS_PREFIX):
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def _key(self, name):
+        return f"{self.prefix}entry:{name}"
+
+    def _lock_key(self, name):
+        return f"{self.prefix}lock:{name}"
+
+    def read(self, name, newer_than=0):
+        body, saved_at = self.client.hmget(self._key(name), 'body', 'saved_at')
+        if body is None or saved_at is None or float(saved_at) <= newer_than:
+            return None
+        return body, float(saved_at)
+
+    def saved_at(self, name):
+        saved_at = self.client.hget(self._key(name), 'saved_at')
+        return float(saved_at) if saved_at is not None else None
+
+    def write(self, name, body, ttl):
+        saved_at = time.time()
+        pipe = self.client.pipeline()  # MULTI/EXEC: nobody sees an entry without its expiry
+        pipe.hset(self._key(name), mapping={'body': body, 'saved_at': repr(saved_at)})
+        pipe.expire(self._key(name), max(int(ttl), 1))
+        pipe.execute()
+        return saved_at
+
+    def delete(self, name):
+        return self.client.delete(self._key(name)) > 0
+
+    def names(self):
+        start = len(self._key(''))
+        return [key[start:].decode('utf-8') for key in self.client.scan_iter(match=self._key('*'), count=500)]
+
+    def acquire_lock(self, name, ttl):
+        token = uuid.uuid4().hex
+        if self.client.set(self._lock_key(name), token, nx=True, ex=max(int(ttl), 1)):
+            return token
+        return None
+
+    def release_lock(self, name, token):
+        # Only our own lock: if it expired and another node took it, leave that one alone
+        key = self._lock_key(name)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.get(key) == token.encode():
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except redis.WatchError:
+                pass
+
+    def wait_lock(self, name, timeout):
+        self.lock_waits += 1
+        key = self._lock_key(name)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.client.exists(key):
+                return True
+            time.sleep(LOCK_POLL_INTERVAL)
+        return False
+
+    def stats(self):
+        return {"backend": self.name, "prefix": self.prefix, "lock_waits": self.lock_waits}
+
+def create_backend(kind, directory, url=REDIS_URL):
+    """The backend for CACHE_BACKEND; falls back to files when Redis is not usable."""
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "redis":
+        if redis is None:
+            print("CACHE_BACKEND=redis but the redis package is not installed, using files")
+        elif not url:
+            print("CACHE_BACKEND=redis but REDIS_URL is not set, using files")
+        else:
+            return RedisBackend.from_url(url)
+    elif kind != "file":
+        print(f"Unknown CACHE_BACKEND {kind!r}, using files")
+    return FileBackend(directory)
@@ -0,0 +1,153 @@
+import json
+import struct
+import sys
+from array import array
+from itertools import repeat
+from operator import itemgetter
+
+# Compact storage format for cached lists of flat records (events, venues).
+#
+# Every record of a list has the same keys, and most values repeat: the venue,
+# 'RON', the same few dates, True/False. So the list is stored by column:
+#
+#   header   magic, format version, index width, row count, table length
+#   table    JSON [keys, values], every distinct value once (interned)
+#   columns  one array of value indexes per key, rows entries each
+#
+# Anything else (nested values, records with different keys, non-lists) is
+# stored as plain JSON. JSON never starts with MAGIC, so readers tell the two
+# apart and entries written before CACHE_FORMAT changed keep working.
+
+MAGIC = b'JCC'
+VERSION = 1
+HEADER = struct.Struct('<3sBcII')  # magic, version, array typecode, rows, table bytes
+
+# Stored entries of either format are wrapped in a bundle that also holds what
+# is served for them, so a read neither re-encodes nor recompresses:
+#
+#   header   BUNDLE_MAGIC, bundle version, length of the index
+#   index    JSON {"etag": ..., "parts": [[name, length], ...]}
+#   parts    the payload ('json' or 'compact'), then one body per Content-Encoding
+#
+# Parts are returned as views of the stored bytes, so a memory-mapped entry is
+# served straight from the mapping.
+BUNDLE_MAGIC = b'JCB'
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct('<3sBI')  # magic, version, index bytes
+
+SCALARS = (str, int, float, bool, type(None))
+
+class UnsupportedVersion(ValueError):
+    pass
+
+def _index_typecode(count):
+    for typecode in ('B', 'H', 'I'):
+        if count <= 1 << (8 * array(typecode).itemsize):
+            return typecode
+    raise ValueError("too many distinct values")
+
+def encode_compact(data):
+    """Column-encoded bytes for a list of same-keyed flat dicts, or None if data does not fit that shape."""
+    if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+        return None
+    keys = list(data[0])
+    values = []
+    interned = {}  # (type, value) -> index; True, 1 and 1.0 are distinct values here
+    columns = [[] for _ in keys]
+    for row in data:
+        # Same keys in the same order, so the JSON served from it is byte-identical
+        if not isinstance(row, dict) or list(row) != keys:
+            return None
+        for column, value in zip(columns, row.values()):
+            if not isinstance(value, SCALARS):
+                return None
+            slot = (type(value), value)
+            index = interned.get(slot)
+            if index is None:
+                index = interned[slot] = len(values)
+                values.append(value)
+            column.append(index)
+
+    typecode = _index_typecode(len(values))
+    table = json.dumps([keys, values], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    parts = [HEADER.pack(MAGIC, VERSION, typecode.encode('ascii'), len(data), len(table)), table]
+    for column in columns:
+        indexes = array(typecode, column)
+        if sys.byteorder == 'big':
+            indexes.byteswap()
+        parts.append(indexes.tobytes())
+    return b''.join(parts)
+
+def is_compact(body):
+    return body[:len(MAGIC)] == MAGIC
+
+def decode_compact(body):
+    """
+    The list encode_compact was given. Raises UnsupportedVersion for entries
+    written by another format version and ValueError for corrupt ones.
+    """
+    try:
+        magic, version, typecode, rows, table_len = HEADER.unpack_from(body)
+    except struct.error:
+        raise ValueError("truncated compact cache entry")
+    if magic != MAGIC:
+        raise ValueError("not a compact cache entry")
+    if version != VERSION:
+        raise UnsupportedVersion(f"compact cache format v{version}, this build reads v{VERSION}")
+    start = HEADER.size + table_len
+    try:
+        keys, values = json.loads(bytes(body[HEADER.size:start]))  # body may be a view of a mapping
+        typecode = typecode.decode('ascii')
+        width = array(typecode).itemsize * rows
+        if len(body) != start + width * len(keys):
+            raise ValueError("truncated compact cache entry")
+        columns = []
+        for i in range(len(keys)):
+            indexes = array(typecode)
+            indexes.frombytes(body[start + i * width:start + (i + 1) * width])
+            if sys.byteorder == 'big':
+                indexes.byteswap()
+            # itemgetter looks up a whole column in one C call (and wants 2+ indexes to return a tuple)
+            columns.append(itemgetter(*indexes)(values) if rows > 1 else [values[indexes[0]]])
+    except (IndexError, TypeError) as e:
+        raise ValueError(f"corrupt compact cache entry: {e}")
+    return list(map(dict, map(zip, repeat(keys), zip(*columns))))
+
+
+def encode_bundle(etag, parts):
+    """Bundle bytes for an ETag and [(name, bytes)] parts, the payload first."""
+    index = json.dumps({"etag": etag, "parts": [[name, len(data)] for name, data in parts]},
+                       separators=(',', ':')).encode('utf-8')
+    return b''.join([BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index)), index]
+                    + [data for _, data in parts])
+
+def is_bundle(body):
+    return body[:len(BUNDLE_MAGIC)] == BUNDLE_MAGIC
+
+def decode_bundle(body):
+    """
+    (etag, {name: memoryview}) for bundle bytes (or an mmap of them), the views
+    in the order they were stored. Raises UnsupportedVersion or ValueError.
+    """
+    try:
+        magic, version, index_len = BUNDLE_HEADER.unpack_from(body)
+    except struct.error:
+        raise ValueError("truncated cache bundle")
+    if magic != BUNDLE_MAGIC:
+        raise ValueError("not a cache bundle")
+    if version != BUNDLE_VERSION:
+        raise UnsupportedVersion(f"cache bundle v{version}, this build reads v{BUNDLE_VERSION}")
+    start = BUNDLE_HEADER.size + index_len
+    view = memoryview(body)
+    try:
+        index = json.loads(bytes(view[BUNDLE_HEADER.size:start]))
+        parts = {}
+        for name, length in index["parts"]:
+            parts[name] = view[start:start + length]
+            start += length
+        etag = index["etag"]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"corrupt cache bundle: {e}")
+    if start != len(view):
+        raise ValueError("truncated cache bundle")
+    return etag, parts
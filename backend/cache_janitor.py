@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+
+import cache
+from cache_backends import TMP_SUFFIX
+
+CACHE_JANITOR_ENABLED = os.environ.get("CACHE_JANITOR_ENABLED", "1") == "1"
+CACHE_JANITOR_INTERVAL = int(os.environ.get("CACHE_JANITOR_INTERVAL", 600))  # seconds between sweeps
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 256 * 1024 * 1024))  # total size of cache_data
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 1000))
+TMP_MAX_AGE = 3600  # temp files this old were left behind by a crashed write
+
+class CacheJanitor:
+    """
+    Keeps cache_data bounded. Every sweep deletes entries past CACHE_HARD_TTL,
+    then least recently used ones until the directory is under max_bytes and
+    max_entries. Recency is the file's atime, which each worker bumps for the
+    entries it served, so every worker's janitor sees the same LRU order.
+    Only the file backend needs it: Redis entries expire on their own.
+    """
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_entries=CACHE_MAX_ENTRIES, interval=CACHE_JANITOR_INTERVAL):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.interval = interval
+        self.last_report = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scan(self, directory):
+        """Returns [(name, size, saved_at, last_used)] for the entries on disk."""
+        accessed = cache.access_times()
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(TMP_SUFFIX):
+                self._remove_orphan(path)
+                continue
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    last_used = max(st.st_atime, st.st_mtime)
+                    served = accessed.get(name)
+                    if served is not None and served > last_used:
+                        # Share this worker's hits with the others (mtime stays the save time).
+                        # Through the open handle, so a file renamed over it meanwhile is left alone.
+                        target = f.fileno() if os.utime in os.supports_fd else path
+                        os.utime(target, (served, st.st_mtime))
+                        last_used = served
+            except FileNotFoundError:
+                continue
+            entries.append((name, st.st_size, st.st_mtime, last_used))
+        return entries
+
+    def _remove_orphan(self, path):
+        try:
+            if time.time() - os.path.getmtime(path) > TMP_MAX_AGE:
+                os.unlink(path)
+        except OSError:
+            pass
+
+    def run_once(self):
+        started = time.time()
+        directory = getattr(cache.backend, 'directory', None)
+        if directory is None or not os.path.exists(directory):
+            return None
+        entries = self._scan(directory)
+
+        expired = [e for e in entries if started - e[2] > cache.CACHE_HARD_TTL]
+        live = sorted((e for e in entries if started - e[2] <= cache.CACHE_HARD_TTL), key=lambda e: e[3])
+        total_bytes = sum(e[1] for e in live)
+
+        evicted = []
+        while live and (total_bytes > self.max_bytes or len(live) > self.max_entries):
+            entry = live.pop(0)
+            total_bytes -= entry[1]
+            evicted.append(entry)
+
+        deleted = 0
+        for name, _, _, _ in expired + evicted:
+            try:
+                deleted += cache.delete_entry(name)
+            except OSError as e:
+                print(f"[janitor] Error deleting {name}: {e}")
+
+        self.last_report = {
+            "at": round(started),
+            "expired": len(expired),
+            "evicted": len(evicted),
+            "deleted": deleted,
+            "entries": len(live),
+            "bytes": total_bytes,
+        }
+        if expired or evicted:
+            print(f"[janitor] Removed {len(expired)} expired and {len(evicted)} LRU entries "
+                  f"({len(live)} entries, {total_bytes} bytes left)")
+        return self.last_report
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[janitor] Sweep failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="cache-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "enabled": self._thread is not None,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "last_sweep": self.last_report,
+        }
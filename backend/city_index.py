@@ -0,0 +1,76 @@
+import re
+
+from text_utils import fold, within_one_edit
+
+DEFAULT_LIMIT = 20
+MIN_FUZZY_LENGTH = 3  # shorter queries match too many names with one typo
+
+# Match ranks, best first
+EXACT, PREFIX, WORD_PREFIX, INFIX, FUZZY = range(5)
+
+WORD_SPLIT_RE = re.compile(r'[\s-]+')
+
+def _deletes(text):
+    return {text[:i] + text[i + 1:] for i in range(len(text))}
+
+class CityIndex:
+    """
+    Precomputed search over the city list, built once at startup.
+    Every diacritic-folded substring of a city name maps to its ranked matches
+    (exact, name prefix, word prefix, infix), so a keystroke is one dict lookup.
+    Queries that match nothing fall back to a delete-variant index over name
+    and word prefixes, so one typo is tolerated.
+    """
+    def __init__(self, cities):
+        self.cities = list(cities)
+        substrings = {}  # folded substring -> {position: best rank}
+        self._fuzzy = {}  # prefix, or prefix minus one letter -> {(position, prefix)}
+
+        for pos, city in enumerate(self.cities):
+            name = fold(city['name'])
+            word_starts = [0] + [m.end() for m in WORD_SPLIT_RE.finditer(name)]
+            for start in range(len(name)):
+                for end in range(start + 1, len(name) + 1):
+                    if start == 0:
+                        rank = EXACT if end == len(name) else PREFIX
+                    else:
+                        rank = WORD_PREFIX if start in word_starts else INFIX
+                    matches = substrings.setdefault(name[start:end], {})
+                    if rank < matches.get(pos, FUZZY):
+                        matches[pos] = rank
+
+            for start in word_starts:
+                for end in range(start + MIN_FUZZY_LENGTH - 1, len(name) + 1):
+                    prefix = name[start:end]
+                    for key in _deletes(prefix) | {prefix}:
+                        self._fuzzy.setdefault(key, set()).add((pos, prefix))
+
+        self._substrings = {
+            key: [pos for pos, _ in sorted(matches.items(), key=lambda m: (m[1], self._sort_key(m[0])))]
+            for key, matches in substrings.items()
+        }
+
+    def _sort_key(self, pos):
+        name = self.cities[pos]['name']
+        return (len(name), fold(name))
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Best matches for what the user has typed so far, at most `limit` of them."""
+        folded = fold(query.strip())
+        if not folded:
+            return []
+        positions = self._substrings.get(folded, [])[:limit]
+
+        # Typo tolerance only kicks in when nothing matches as typed
+        if not positions and len(folded) >= MIN_FUZZY_LENGTH:
+            candidates = set()
+            for key in _deletes(folded) | {folded}:
+                for pos, prefix in self._fuzzy.get(key, ()):
+                    if within_one_edit(folded, prefix):
+                        candidates.add(pos)
+            positions = sorted(candidates, key=self._sort_key)[:limit]
+
+        return [self.cities[pos] for pos in positions]
+
+    def stats(self):
+        return {"cities": len(self.cities), "keys": len(self._substrings), "fuzzy_keys": len(self._fuzzy)}
@@ -0,0 +1,57 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzip-encoded
+    brotli = None
+
+# Bodies are compressed once and reused, so spend a bit more CPU for size.
+# (Brotli above 9 gets ~5% smaller but is ~70x slower.)
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+MIN_COMPRESS_SIZE = 1024  # smaller bodies are not worth a Content-Encoding
+
+# Preferred first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Encoded variants of response bodies that are not cache entries
+# (merged venue lists, filtered event pages...), keyed by ETag
+RECENT_BODIES_MAX = 64
+
+def compute_etag(body):
+    """Content hash of a serialized body; identical bytes always get the same ETag."""
+    return hashlib.md5(body).hexdigest()
+
+def encode_body(body):
+    """Returns {encoding: compressed bytes} for every supported Content-Encoding."""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+    encoded = {'gzip': gzip.compress(body, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return encoded
+
+class EncodedBodies:
+    """Small LRU of encode_body() results, so repeated identical responses are compressed once."""
+    def __init__(self, max_entries=RECENT_BODIES_MAX):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, body):
+        with self._lock:
+            encoded = self._entries.get(etag)
+            if encoded is not None:
+                self._entries.move_to_end(etag)
+                return encoded
+        encoded = encode_body(body)
+        with self._lock:
+            self._entries[etag] = encoded
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return encoded
+
+recent_bodies = EncodedBodies()
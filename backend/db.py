@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+
+# Small helper for the SQLite stores: one connection per thread, WAL mode so
+# readers don't block the writer, and a busy timeout for writers in other
+# gunicorn workers.
+
+BUSY_TIMEOUT = 30  # seconds
+
+class SQLiteDB:
+    def __init__(self, path, schema):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+        self.write_lock = threading.Lock()  # one writer per process at a time
+        with self.write_lock:
+            conn = self.connection()
+            conn.executescript(schema)
+            conn.commit()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        """Context manager: BEGIN IMMEDIATE ... COMMIT (or ROLLBACK on error)."""
+        return _Transaction(self)
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.write_lock.acquire()
+        try:
+            self.conn = self.db.connection()
+            self.conn.execute("BEGIN IMMEDIATE")
+        except BaseException:
+            # e.g. still busy after BUSY_TIMEOUT: __exit__ won't run
+            self.db.write_lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.db.write_lock.release()
+        return False
@@ -0,0 +1,71 @@
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right
+
+# Sorted start_date index over a cached event list, for date-range and
+# paginated reads of /api/events without scanning the whole list.
+
+MAX_INDEXES = 64
+
+def _sort_key(e):
+    return (e.get('start_date') or '', e.get('url') or '')
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Raises ValueError on a malformed cursor."""
+    try:
+        start_date, url = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("invalid cursor")
+    # Cursors are _sort_key tuples: two strings (a missing start_date is '')
+    if not isinstance(start_date, str) or not isinstance(url, str):
+        raise ValueError("invalid cursor")
+    return (start_date, url)
+
+class EventIndex:
+    def __init__(self, events):
+        ordered = sorted(events, key=_sort_key)
+        self.all = (ordered, [_sort_key(e) for e in ordered])
+        standup = [e for e in ordered if e.get('is_standup')]
+        self.standup = (standup, [_sort_key(e) for e in standup])
+
+    def query(self, from_date=None, to_date=None, standup_only=False, cursor=None, limit=None):
+        """
+        Returns (events, next_cursor). Dates are 'YYYY-MM-DD' and both ends are inclusive.
+        next_cursor is None on the last page.
+        """
+        events, keys = self.standup if standup_only else self.all
+
+        lo = bisect_left(keys, (from_date, '')) if from_date else 0
+        if cursor is not None:
+            lo = max(lo, bisect_right(keys, cursor))
+        # '\uffff' sorts after any time suffix, so every event of the last day is included
+        hi = bisect_left(keys, (to_date + '\uffff', '')) if to_date else len(keys)
+
+        if limit is not None and hi - lo > limit:
+            page = events[lo:lo + limit]
+            return page, encode_cursor(keys[lo + limit - 1])
+        return events[lo:hi], None
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index(name, entry):
+    """
+    Index for a cache entry (a cache.CachedBody). Rebuilt only when the entry
+    changes, which its ETag tells without touching the body.
+    """
+    with _indexes_lock:
+        cached = _indexes.get(name)
+    if cached is not None and cached[0] == entry.etag:
+        return cached[1]
+
+    index = EventIndex(entry.data())
+    with _indexes_lock:
+        if name not in _indexes and len(_indexes) >= MAX_INDEXES:
+            _indexes.pop(next(iter(_indexes)))
+        _indexes[name] = (entry.etag, index)
+    return index
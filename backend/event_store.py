@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import time
+
+from db import SQLiteDB
+
+EVENT_DB_FILE = os.environ.get("EVENT_DB_FILE", os.path.join(os.path.dirname(__file__), 'events.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    url TEXT PRIMARY KEY,
+    data TEXT NOT NULL,         -- event dict without the per-city 'is_standup' flag
+    hash TEXT NOT NULL,
+    start_date TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_start_date ON events(start_date);
+
+-- Which city listings an event appears on ('all' is the global stand-up listing)
+CREATE TABLE IF NOT EXISTS event_cities (
+    city TEXT NOT NULL,
+    url TEXT NOT NULL REFERENCES events(url),
+    position INTEGER NOT NULL,  -- order on the listing
+    is_standup INTEGER NOT NULL,
+    PRIMARY KEY (city, url)
+);
+
+CREATE TABLE IF NOT EXISTS crawls (
+    city TEXT PRIMARY KEY,
+    crawled_at REAL NOT NULL,
+    event_count INTEGER NOT NULL
+);
+"""
+
+SQL_CHUNK = 500  # stay under SQLite's bound-parameter limit
+
+def event_key(event):
+    """Events are keyed by URL; the rare event without one gets a content-derived key."""
+    if event.get('url'):
+        return event['url']
+    raw = f"{event.get('title')}|{event.get('start_date')}|{event.get('location')}"
+    return "nourl:" + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def _split(event):
+    data = {k: v for k, v in event.items() if k != 'is_standup'}
+    payload = json.dumps(data, ensure_ascii=False)
+    return payload, hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class EventStore:
+    """
+    Persistent events keyed by URL, with first/last-seen timestamps.
+    An event listed under several cities (and under 'all') is stored once.
+    """
+    def __init__(self, path=EVENT_DB_FILE):
+        self.db = SQLiteDB(path, SCHEMA)
+
+    def upsert_events(self, city, events):
+        """
+        Records the result of a crawl of `city`: new or changed events are
+        written, unchanged ones only get last_seen bumped, and events that
+        are no longer listed for the city are unlinked from it.
+        Returns counts of inserted / updated / unchanged / removed events.
+        """
+        now = time.time()
+        rows = {}
+        for position, e in enumerate(events):
+            key = event_key(e)
+            if key not in rows:
+                payload, digest = _split(e)
+                rows[key] = (position, payload, digest, e.get('start_date'), 1 if e.get('is_standup') else 0)
+
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        keys = list(rows)
+        with self.db.transaction() as conn:
+            existing = {}
+            for i in range(0, len(keys), SQL_CHUNK):
+                chunk = keys[i:i + SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                existing.update(conn.execute(f"SELECT url, hash FROM events WHERE url IN ({marks})", chunk))
+
+            inserts, updates, touches = [], [], []
+            for key, (position, payload, digest, start_date, _) in rows.items():
+                if key not in existing:
+                    inserts.append((key, payload, digest, start_date, now, now))
+                elif existing[key] != digest:
+                    updates.append((payload, digest, start_date, now, key))
+                else:
+                    touches.append((now, key))
+            conn.executemany(
+                "INSERT INTO events (url, data, hash, start_date, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                inserts)
+            conn.executemany("UPDATE events SET data = ?, hash = ?, start_date = ?, last_seen = ? WHERE url = ?", updates)
+            conn.executemany("UPDATE events SET last_seen = ? WHERE url = ?", touches)
+            counts['inserted'], counts['updated'], counts['unchanged'] = len(inserts), len(updates), len(touches)
+
+            # Links only change when the position or stand-up flag moved
+            conn.executemany(
+                "INSERT INTO event_cities (city, url, position, is_standup) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(city, url) DO UPDATE SET position = excluded.position, is_standup = excluded.is_standup "
+                "WHERE position != excluded.position OR is_standup != excluded.is_standup",
+                [(city, key, position, is_std) for key, (position, _, _, _, is_std) in rows.items()])
+
+            linked = [url for (url,) in conn.execute("SELECT url FROM event_cities WHERE city = ?", (city,))]
+            gone = [(city, url) for url in linked if url not in rows]
+            conn.executemany("DELETE FROM event_cities WHERE city = ? AND url = ?", gone)
+            counts['removed'] = len(gone)
+
+            conn.execute(
+                "INSERT INTO crawls (city, crawled_at, event_count) VALUES (?, ?, ?) "
+                "ON CONFLICT(city) DO UPDATE SET crawled_at = excluded.crawled_at, event_count = excluded.event_count",
+                (city, now, len(rows)))
+
+        print(f"[{city}] Event store: {counts['inserted']} new, {counts['updated']} changed, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+        return counts
+
+    def get_events(self, city):
+        """Events currently listed for a city, in listing order."""
+        conn = self.db.connection()
+        rows = conn.execute(
+            "SELECT e.data, c.is_standup FROM event_cities c JOIN events e ON e.url = c.url "
+            "WHERE c.city = ? ORDER BY c.position",
+            (city,))
+        events = []
+        for data, is_standup in rows:
+            event = json.loads(data)
+            event['is_standup'] = bool(is_standup)
+            events.append(event)
+        return events
+
+    def crawled_cities(self):
+        return [city for (city,) in self.db.connection().execute("SELECT city FROM crawls")]
+
+    def get_crawl_age(self, city):
+        """Seconds since the last recorded crawl of a city, or None if it was never crawled."""
+        row = self.db.connection().execute("SELECT crawled_at FROM crawls WHERE city = ?", (city,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def expire_crawls(self, city=None):
+        """
+        Marks the crawls of a city (or of every city) as old, so the next fetch
+        scrapes instead of answering from the store. The events stay.
+        """
+        with self.db.transaction() as conn:
+            if city is None:
+                conn.execute("UPDATE crawls SET crawled_at = 0")
+            else:
+                conn.execute("UPDATE crawls SET crawled_at = 0 WHERE city = ?", (city,))
+
+    def stats(self):
+        conn = self.db.connection()
+        return {
+            "events": conn.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+            "links": conn.execute("SELECT COUNT(*) FROM event_cities").fetchone()[0],
+            "cities": conn.execute("SELECT COUNT(*) FROM crawls").fetchone()[0],
+        }
+
+event_store = EventStore()
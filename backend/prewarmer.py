@@ -0,0 +1,211 @@
+import os
+import hashlib
+import tempfile
+import threading
+import weakref
+import concurrent.futures
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every process prewarms
+    fcntl = None
+
+import cache
+from scrapers.event_scraper import EventScraper
+from scrapers.location_scraper import LocationScraper
+
+PREWARM_ENABLED = os.environ.get("PREWARM_ENABLED", "0") == "1"
+PREWARM_TOP_N = int(os.environ.get("PREWARM_TOP_N", 10))
+PREWARM_INTERVAL = int(os.environ.get("PREWARM_INTERVAL", 300))  # seconds between cycles
+PREWARM_LEAD_TIME = int(os.environ.get("PREWARM_LEAD_TIME", 600))  # refresh this long before expiry
+PREWARM_CONCURRENCY = int(os.environ.get("PREWARM_CONCURRENCY", 2))
+PREWARM_REQUEST_BUDGET = int(os.environ.get("PREWARM_REQUEST_BUDGET", 150))  # outbound requests per cycle
+
+# Name of the fetch lock that elects the prewarming node on shared backends
+PREWARM_LOCK_NAME = "_prewarm"
+
+# Warmed first while there is no traffic yet (fresh worker)
+SEED_CITIES = ['all', 'bucuresti', 'cluj-napoca', 'timisoara', 'iasi', 'sibiu']
+
+_prewarmers = weakref.WeakSet()
+
+def _after_fork_in_child():
+    for prewarmer in list(_prewarmers):
+        prewarmer._after_fork()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+class CachePrewarmer:
+    """
+    Keeps the evt/loc cache entries of the most requested cities warm.
+    Every cycle ranks cities by observed request frequency, then refreshes the
+    entries that are missing or about to expire, within the outbound request budget.
+
+    Each gunicorn worker runs one, but only the elected one spends the budget, so
+    it is per deployment rather than per worker:
+    - shared backends (Redis): whoever takes the backend lock, which expires
+      after one interval, so at most one cycle runs per interval across nodes;
+    - file backend: whoever holds an flock on this node's lock file, until it
+      exits and another worker takes over;
+    - memory backend: every process, since each has its own cache.
+    The elected worker ranks cities by the requests it served itself. With
+    gunicorn --preload the thread starts in the master before the fork, so the
+    master is the one prewarming (the seed cities, as it serves no requests).
+    """
+    def __init__(self, cities, fetchers):
+        # fetchers: {"evt": fn(city), "loc": fn(city)}; each scrapes and saves to cache
+        self.cities = cities
+        self.fetchers = fetchers
+        self.scrapers = {"evt": EventScraper(), "loc": LocationScraper()}
+        self.request_counts = Counter()
+        self.last_report = None
+        self.leader = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_file = None
+        _prewarmers.add(self)
+
+    def record_request(self, city):
+        with self._lock:
+            self.request_counts[city] += 1
+
+    def ranked_cities(self):
+        known = ['all'] + [c['slug'] for c in self.cities]
+        known_set = set(known)
+        with self._lock:
+            counts = dict(self.request_counts)
+
+        seed_rank = {slug: i for i, slug in enumerate(SEED_CITIES)}
+        order = {slug: i for i, slug in enumerate(known)}
+        candidates = known_set & (set(counts) | set(SEED_CITIES))
+        return sorted(
+            candidates,
+            key=lambda slug: (-counts.get(slug, 0), seed_rank.get(slug, len(SEED_CITIES)), order[slug])
+        )[:PREWARM_TOP_N]
+
+    def _needs_refresh(self, prefix, city):
+        age = cache.get_cache_age(prefix, city)
+        return age is None or age >= cache.CACHE_SOFT_TTL - PREWARM_LEAD_TIME
+
+    def _plan(self):
+        """Returns [(prefix, city)] to refresh this cycle, and the requests it will cost."""
+        plan = []
+        spent = 0
+        for city in self.ranked_cities():
+            for prefix, scraper in self.scrapers.items():
+                cost = scraper.estimate_requests(city)
+                # Nothing to scrape (e.g. locations for 'all') or still fresh enough
+                if cost == 0 or not self._needs_refresh(prefix, city):
+                    continue
+                if spent + cost > PREWARM_REQUEST_BUDGET:
+                    return plan, spent
+                plan.append((prefix, city))
+                spent += cost
+        return plan, spent
+
+    def _refresh(self, prefix, city):
+        fetch = self.fetchers[prefix]
+        # Joins an inline scrape of the same key instead of starting a second one
+        cache.single_flight(prefix, city, lambda: fetch(city))
+
+    def _file_lock_path(self):
+        # Not in the cache directory: clearing the cache would delete it under its holder
+        directory = os.path.abspath(cache.backend.directory)
+        digest = hashlib.md5(directory.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(tempfile.gettempdir(), f"prewarm-{digest}.lock")
+
+    def _elect(self):
+        """True if this process should run the cycle."""
+        backend = cache.backend
+        if backend.shared:
+            try:
+                return backend.acquire_lock(PREWARM_LOCK_NAME, PREWARM_INTERVAL) is not None
+            except backend.errors as e:
+                print(f"[prewarm] Could not take the prewarm lock: {e}")
+                return False
+        if backend.name != 'file' or fcntl is None:
+            return True
+        if self._lock_file is None:
+            self._lock_file = open(self._file_lock_path(), 'a')
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _release(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # drops the flock
+            self._lock_file = None
+
+    def _after_fork(self):
+        """
+        In a forked child: the prewarmer thread and its lock are the parent's.
+        The child starts out as a non-leader with no lock of its own, and runs
+        nothing unless start() is called there.
+        """
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock_file = None  # the parent's open file: closing our copy keeps its flock
+        self.leader = False
+
+    def run_once(self):
+        self.leader = self._elect()
+        if not self.leader:
+            self.last_report = {"skipped": "another worker is prewarming"}
+            return self.last_report
+
+        plan, budget_used = self._plan()
+        refreshed, failed = [], []
+        if plan:
+            print(f"[prewarm] Refreshing {len(plan)} entries (~{budget_used} requests)...")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=PREWARM_CONCURRENCY) as executor:
+                future_to_item = {executor.submit(self._refresh, *item): item for item in plan}
+                for future in concurrent.futures.as_completed(future_to_item):
+                    prefix, city = future_to_item[future]
+                    try:
+                        future.result()
+                        refreshed.append(f"{prefix}:{city}")
+                    except Exception as e:
+                        print(f"[prewarm] {prefix}:{city} failed: {e}")
+                        failed.append(f"{prefix}:{city}")
+
+        self.last_report = {
+            "refreshed": refreshed,
+            "failed": failed,
+            "budget_used": budget_used,
+            "budget": PREWARM_REQUEST_BUDGET,
+        }
+        return self.last_report
+
+    def _loop(self):
+        stop = self._stop
+        while not stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[prewarm] Cycle failed: {e}")
+            stop.wait(PREWARM_INTERVAL)
+        self._release()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="cache-prewarmer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            top = self.request_counts.most_common(PREWARM_TOP_N)
+        return {
+            "enabled": self._thread is not None,
+            "leader": self.leader,
+            "top_requested": top,
+            "last_cycle": self.last_report,
+        }
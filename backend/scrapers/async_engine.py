@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+try:
+    import aiohttp
+except ImportError:  # optional: only needed for engine='async'
+    aiohttp = None
+
+from scrapers.event_scraper import EventScraper, BASE_URL
+from scrapers.page_cache import page_validators
+from scrapers.http_session import DEFAULT_TIMEOUT, RETRIES, BACKOFF_FACTOR, RETRY_STATUSES
+
+# asyncio scraping engine.
+# Same adaptive crawl and output as EventScraper, but all pages of all cities
+# are fetched from one event loop instead of a thread per in-flight request.
+
+MAX_CONCURRENCY = 30  # in-flight requests across all cities
+RATE_LIMIT = 20  # requests per second towards iabilet.ro
+RATE_BURST = 10
+
+class AsyncRateLimiter:
+    """
+    Token bucket shared by every crawl running on the async engine.
+    Tokens are reserved under a thread lock, so crawls running on separate
+    event loops (one per Flask request thread) draw from the same budget.
+    """
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Takes a token (possibly ahead of time) and returns how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+shared_rate_limiter = AsyncRateLimiter()
+
+class AsyncEventScraper(EventScraper):
+    MAX_CONCURRENCY = MAX_CONCURRENCY
+
+    def __init__(self, base_url=BASE_URL, max_concurrency=None, rate_limiter=None):
+        if aiohttp is None:
+            raise RuntimeError("The async engine needs aiohttp (pip install aiohttp)")
+        super().__init__(base_url)
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+
+    async def _fetch(self, session, semaphore, url):
+        """Returns (status, body, etag, last_modified), or None if the fetch failed."""
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        headers.update(page_validators.conditional_headers(url))
+        for attempt in range(RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(BACKOFF_FACTOR * (2 ** (attempt - 1)))
+            try:
+                await self.rate_limiter.acquire()
+                async with semaphore:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status in RETRY_STATUSES:
+                            continue
+                        body = await response.read()
+                        return (response.status, body,
+                                response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                continue
+        return None
+
+    async def scrape_page_async(self, session, semaphore, city, page):
+        url = self.page_url(city, page)
+        result = await self._fetch(session, semaphore, url)
+        if result is None:
+            return None
+        return self.handle_response(city, url, *result)
+
+    async def _crawl(self, session, semaphore, city):
+        state = self.start_crawl(city, workers=f"{self.max_concurrency} async slots")
+        pages = {}
+        for wave in state.waves():
+            tasks = {asyncio.ensure_future(self.scrape_page_async(session, semaphore, city, p)): p for p in wave}
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = tasks[task]
+                    new_events = state.add_page(page, task.result())
+                    if new_events is not None:
+                        pages[page] = new_events
+                if state.stop_page is not None:
+                    for task in list(pending):
+                        if tasks[task] > state.stop_page:
+                            task.cancel()
+                            pending.discard(task)
+                            state.cancelled += 1
+
+        self.finish_crawl(state)
+        all_events = []
+        for page in sorted(pages):
+            all_events.extend(pages[page])
+        return all_events
+
+    def _session(self):
+        connect_timeout, read_timeout = DEFAULT_TIMEOUT
+        timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        return aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+    async def get_events_many_async(self, cities):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._session() as session:
+            results = await asyncio.gather(*(self._crawl(session, semaphore, city) for city in cities))
+        return dict(zip(cities, results))
+
+    def get_events_many(self, cities):
+        """Crawls several cities concurrently on one event loop. Returns {city: events}."""
+        return asyncio.run(self.get_events_many_async(list(cities)))
+
+    def get_events(self, city, engine='async'):
+        if engine != 'async':
+            return super().get_events(city, engine)
+        return self.get_events_many([city])[city]
@@ -1,128 +1,329 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import datetime
 import time
+import threading
+import concurrent.futures
+from collections import deque
+from scrapers.http_session import fetch
+from scrapers.page_cache import page_validators, content_hash
+from scrapers import ld_json
+from artist_index import extract_artist
+
+BASE_URL = "https://www.iabilet.ro"
+
+def process_event(item, is_global):
+    title = item.get('name', '')
+    # Stand-up detection
+    t_lower = title.lower()
+    is_std = True if is_global else ('stand up' in t_lower or 'stand-up' in t_lower or 'comedy' in t_lower)
+
+    # Image handling
+    img_raw = item.get('image')
+    image_url = None
+    if isinstance(img_raw, list) and img_raw:
+        image_url = img_raw[0] if isinstance(img_raw[0], str) else img_raw[0].get('url')
+    elif isinstance(img_raw, dict):
+        image_url = img_raw.get('url')
+    elif isinstance(img_raw, str):
+        image_url = img_raw
+
+    # Price handling
+    price = None
+    offers = item.get('offers')
+    if isinstance(offers, dict):
+        price = offers.get('price') or offers.get('lowPrice')
+    elif isinstance(offers, list) and offers:
+        price = offers[0].get('price') or offers[0].get('lowPrice')
+
+    # Clean price (sometimes it's "50.00", make it "50")
+    if price:
+        try:
+            price = f"{float(price):.0f}"
+        except:
+            pass
+
+    # Location Handling
+    loc_obj = item.get('location', {})
+    loc_name = loc_obj.get('name')
+    # Try to find URL in location object (address? sameAs? url?)
+    # iabilet JSON-LD typically only has 'name' and 'address'.
+    # If no URL, we will derive it in the frontend or use a search query.
+    loc_url = loc_obj.get('url') or loc_obj.get('sameAs')
+
+    return {
+        'title': title,
+        'start_date': item.get('startDate'),
+        'end_date': item.get('endDate'),
+        'location': loc_name,
+        'location_url': loc_url,
+        'url': item.get('url'),
+        'image': image_url,
+        'price': price,
+        'currency': 'RON', # Assuming RON for iabilet
+        'is_standup': is_std,
+        'artist': extract_artist(title)
+    }
+
+def events_from_ld_json(bodies, is_global):
+    """Builds event dicts from the raw text of the page's ld+json scripts."""
+    events_on_page = []
+    for content in bodies:
+        try:
+            if not content: continue
+            content = content.replace('/*<![CDATA[*/', '').replace('/*]]>*/', '').strip()
+            data = json.loads(content)
+
+            if isinstance(data, dict) and data.get('@type') == 'Event':
+                 events_on_page.append(process_event(data, is_global))
+            elif isinstance(data, list):
+                for item in data:
+                    if item.get('@type') == 'Event':
+                        events_on_page.append(process_event(item, is_global))
+        except:
+            continue
+
+    return events_on_page
+
+def parse_page_soup(content, is_global):
+    """Extracts the events from the JSON-LD blocks of a listing page (BeautifulSoup path)."""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Check for empty result
+    if "nu am gasit evenimente" in soup.get_text().lower():
+        return []
+
+    script_tags = soup.find_all('script', type='application/ld+json')
+    return events_from_ld_json([script.string for script in script_tags], is_global)
+
+def parse_page(content, is_global):
+    """Extracts the events from the JSON-LD blocks of a listing page, without building a DOM."""
+    is_empty, bodies = ld_json.extract(content)
+    if is_empty:
+        return []
+    return events_from_ld_json(bodies, is_global)
+
+class CrawlState:
+    """
+    Bookkeeping for one adaptive crawl of a city, shared by the scraping engines.
+    Tracks where the listing ends, de-duplicates events and counts pages.
+    """
+    def __init__(self, city, first_wave, wave_size, max_pages):
+        self.city = city
+        self.first_wave = first_wave
+        self.wave_size = wave_size
+        self.max_pages = max_pages
+        self.started = time.time()
+        self.seen_urls = set()
+        self.stop_page = None
+        self.next_page = 1
+        self.fetched = self.useful = self.failed = self.cancelled = self.total_events = 0
+        self.last_useful_page = 0
+
+    def waves(self):
+        """Yields ranges of pages to fetch until the end of the listing is found."""
+        size = self.first_wave
+        while self.stop_page is None and self.next_page <= self.max_pages:
+            last_page = min(self.next_page + size - 1, self.max_pages)
+            wave = range(self.next_page, last_page + 1)
+            self.next_page = last_page + 1
+            size = self.wave_size
+            yield wave
+
+    def is_wanted(self, page):
+        return self.stop_page is None or page < self.stop_page
+
+    def add_page(self, page, page_events):
+        """
+        Records a fetched page. Returns its new events, or None when the page
+        failed, marks the end of the listing, or lies past the end.
+        """
+        self.fetched += 1
+        if page_events is None:
+            self.failed += 1
+            return None
+        if not self.is_wanted(page):
+            return None
+
+        page_urls = {e['url'] for e in page_events if e.get('url')}
+        if not page_events or (page_urls and page_urls <= self.seen_urls):
+            self.stop_page = page
+            return None
+
+        new_events = [e for e in page_events if not e.get('url') or e['url'] not in self.seen_urls]
+        self.seen_urls.update(page_urls)
+        self.useful += 1
+        self.total_events += len(new_events)
+        self.last_useful_page = max(self.last_useful_page, page)
+        return new_events
+
+    def report(self):
+        return {
+            'city': self.city,
+            'pages_fetched': self.fetched,
+            'pages_useful': self.useful,
+            'pages_failed': self.failed,
+            'pages_cancelled': self.cancelled,
+            'first_wave': self.first_wave,
+            'events': self.total_events,
+            'elapsed': round(time.time() - self.started, 2),
+        }
 
 class EventScraper:
-    def get_events(self, city):
-        base_url = "https://www.iabilet.ro"
-        is_global = (city == 'all')
-        
-        # Parallel Scraping Configuration
-        # Scrape 30 pages to reach March/April (approx 720 events)
-        pages_to_scrape = 30 
-        max_workers = 10 
-        
-        all_events = []
-        import concurrent.futures
-        import time
-
-        def scrape_page(page):
-            events_on_page = []
-            if is_global:
-                url = f"{base_url}/bilete-stand-up-comedy/?page={page}"
-            else:
-                s_page = f"?page={page}" if page > 1 else ""
-                url = f"{base_url}/bilete-in-{city}/{s_page}"
-            
-            try:
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                response = requests.get(url, headers=headers, timeout=10)
-                
-                if response.status_code != 200:
-                    return []
-
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Check for empty result
-                if "nu am gasit evenimente" in soup.get_text().lower():
-                    return []
-
-                script_tags = soup.find_all('script', type='application/ld+json')
-                
-                for script in script_tags:
-                    try:
-                        content = script.string
-                        if not content: continue
-                        content = content.replace('/*<![CDATA[*/', '').replace('/*]]>*/', '').strip()
-                        data = json.loads(content)
-                        
-                        def process_event(item):
-                            title = item.get('name', '')
-                            # Stand-up detection
-                            t_lower = title.lower()
-                            is_std = True if is_global else ('stand up' in t_lower or 'stand-up' in t_lower or 'comedy' in t_lower)
-
-                            # Image handling
-                            img_raw = item.get('image')
-                            image_url = None
-                            if isinstance(img_raw, list) and img_raw:
-                                image_url = img_raw[0] if isinstance(img_raw[0], str) else img_raw[0].get('url')
-                            elif isinstance(img_raw, dict):
-                                image_url = img_raw.get('url')
-                            elif isinstance(img_raw, str):
-                                image_url = img_raw
-                            
-                            # Price handling
-                            price = None
-                            offers = item.get('offers')
-                            if isinstance(offers, dict):
-                                price = offers.get('price') or offers.get('lowPrice')
-                            elif isinstance(offers, list) and offers:
-                                price = offers[0].get('price') or offers[0].get('lowPrice')
-                            
-                            # Clean price (sometimes it's "50.00", make it "50")
-                            if price:
-                                try:
-                                    price = f"{float(price):.0f}"
-                                except:
-                                    pass
-
-                            # Location Handling
-                            loc_obj = item.get('location', {})
-                            loc_name = loc_obj.get('name')
-                            # Try to find URL in location object (address? sameAs? url?)
-                            # iabilet JSON-LD typically only has 'name' and 'address'.
-                            # If no URL, we will derive it in the frontend or use a search query.
-                            loc_url = loc_obj.get('url') or loc_obj.get('sameAs')
-
-                            return {
-                                'title': title,
-                                'start_date': item.get('startDate'),
-                                'end_date': item.get('endDate'),
-                                'location': loc_name,
-                                'location_url': loc_url, 
-                                'url': item.get('url'),
-                                'image': image_url,
-                                'price': price,
-                                'currency': 'RON', # Assuming RON for iabilet
-                                'is_standup': is_std
-                            }
-
-                        if isinstance(data, dict) and data.get('@type') == 'Event':
-                             events_on_page.append(process_event(data))
-                        elif isinstance(data, list):
-                            for item in data:
-                                if item.get('@type') == 'Event':
-                                    events_on_page.append(process_event(item))
-                    except:
+    # Parallel Scraping Configuration
+    # Scrape up to 30 pages to reach March/April (approx 720 events)
+    PAGES_TO_SCRAPE = 30
+    MAX_WORKERS = 10
+
+    # Last useful page count per city, shared by all scraper instances.
+    # Used to size the first wave of the next crawl of that city.
+    _page_hints = {}
+    _hints_lock = threading.Lock()
+
+    # Pages fetched vs. useful for the most recent crawls
+    recent_reports = deque(maxlen=20)
+
+    def __init__(self, base_url=BASE_URL):
+        self.base_url = base_url
+        self.last_report = None
+
+    def page_url(self, city, page):
+        if city == 'all':
+            return f"{self.base_url}/bilete-stand-up-comedy/?page={page}"
+        s_page = f"?page={page}" if page > 1 else ""
+        return f"{self.base_url}/bilete-in-{city}/{s_page}"
+
+    def _first_wave_size(self, city):
+        with self._hints_lock:
+            hint = self._page_hints.get(city)
+        if hint is None:
+            return self.MAX_WORKERS
+        # One extra page to confirm the end of the listing
+        return min(hint + 1, self.PAGES_TO_SCRAPE)
+
+    def estimate_requests(self, city):
+        """Upper bound of outbound requests a get_events(city) call will make."""
+        with self._hints_lock:
+            hint = self._page_hints.get(city)
+        if hint is None:
+            return self.PAGES_TO_SCRAPE
+        return min(hint + 1, self.PAGES_TO_SCRAPE)
+
+    def scrape_page(self, city, page):
+        """
+        Returns the events on one listing page.
+        [] means the listing ended (empty page), None means the fetch failed.
+        """
+        url = self.page_url(city, page)
+        try:
+            headers = {'User-Agent': 'Mozilla/5.0'}
+            headers.update(page_validators.conditional_headers(url))
+            response = fetch(url, headers=headers, pool_size=self.MAX_WORKERS)
+
+            return self.handle_response(
+                city, url, response.status_code, response.content,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'),
+            )
+        except Exception:
+            return None
+
+    def handle_response(self, city, url, status, content, etag, last_modified):
+        """
+        Turns a page response into events, reusing the previous parse when the
+        server answered 304 or the body hashes the same as last time.
+        """
+        if status == 404:
+            return []
+        if status == 304:
+            return page_validators.not_modified(url)
+        if status != 200:
+            return None
+
+        digest = content_hash(content)
+        events = page_validators.unchanged(url, digest)
+        if events is None:
+            events = parse_page(content, city == 'all')
+            page_validators.store(url, etag, last_modified, digest, events)
+        return events
+
+    def start_crawl(self, city, workers=None):
+        state = CrawlState(city, self._first_wave_size(city), self.MAX_WORKERS, self.PAGES_TO_SCRAPE)
+        workers = workers or f"{self.MAX_WORKERS} threads"
+        print(f"[{city}] Scraping with {workers} (first wave: {state.first_wave} pages)...")
+        return state
+
+    def finish_crawl(self, state):
+        """Remembers the city's page count and records the crawl report."""
+        if state.failed == 0:
+            with self._hints_lock:
+                self._page_hints[state.city] = state.last_useful_page
+
+        self.last_report = state.report()
+        self.recent_reports.append(self.last_report)
+        print(f"[{state.city}] Scraped {state.total_events} events in {self.last_report['elapsed']:.2f}s "
+              f"({state.useful}/{state.fetched} pages useful, {state.cancelled} cancelled, {state.failed} failed)")
+        return self.last_report
+
+    def open_executor(self):
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+
+    def submit_page(self, executor, city, page):
+        """Schedules one page; the returned future resolves to scrape_page's result."""
+        return executor.submit(self.scrape_page, city, page)
+
+    def iter_pages(self, city):
+        """
+        Yields (page, new_events) as pages complete.
+
+        Pages are probed in waves: the first wave is sized from the city's last
+        crawl, then MAX_WORKERS pages per wave. Once a page comes back empty, or
+        repeats events already seen, the listing has ended and every page after
+        it that has not started yet is cancelled. Events are de-duplicated by URL.
+        """
+        state = self.start_crawl(city)
+
+        executor = self.open_executor()
+        try:
+            for wave in state.waves():
+                future_to_page = {self.submit_page(executor, city, p): p for p in wave}
+
+                for future in concurrent.futures.as_completed(future_to_page):
+                    if future.cancelled():
                         continue
-                
-                return events_on_page
-
-            except Exception:
-                return []
-
-        # Execute in parallel
-        start_total = time.time()
-        print(f"[{city}] Scraping {pages_to_scrape} pages with {max_workers} threads...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_page = {executor.submit(scrape_page, p): p for p in range(1, pages_to_scrape + 1)}
-            for future in concurrent.futures.as_completed(future_to_page):
-                page_events = future.result()
-                all_events.extend(page_events)
-        
-        print(f"[{city}] Scraped {len(all_events)} events in {time.time() - start_total:.2f}s")
+                    page = future_to_page[future]
+                    new_events = state.add_page(page, future.result())
+                    if state.stop_page is not None:
+                        for f, p in future_to_page.items():
+                            if p > state.stop_page and not f.done() and f.cancel():
+                                state.cancelled += 1
+                    if new_events is not None:
+                        yield page, new_events
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.finish_crawl(state)
+
+    def get_events(self, city, engine='threads', on_page=None):
+        """
+        Returns all events for a city.
+        engine='async' runs the crawl on the asyncio engine instead of the thread pool,
+        engine='pipeline' parses pages in a process pool (see scrapers/pipeline.py).
+        on_page(new_events) is called as each page completes (thread engine only),
+        for callers that stream events while the crawl runs.
+        """
+        if engine == 'async':
+            from scrapers.async_engine import AsyncEventScraper
+            return AsyncEventScraper(self.base_url).get_events(city)
+        if engine == 'pipeline':
+            from scrapers.pipeline import PipelineEventScraper
+            return PipelineEventScraper(self.base_url).get_events(city)
+
+        pages = {}
+        for page, new_events in self.iter_pages(city):
+            pages[page] = new_events
+            if on_page is not None:
+                on_page(new_events)
+        all_events = []
+        for page in sorted(pages):
+            all_events.extend(pages[page])
         return all_events
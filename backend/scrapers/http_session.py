@@ -0,0 +1,48 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP session for the scrapers.
+# Keeps connections to iabilet.ro alive between pages instead of doing a
+# new TCP+TLS handshake per request.
+
+DEFAULT_TIMEOUT = (5, 10)  # (connect, read) seconds
+POOL_SIZE = 10  # EventScraper.MAX_WORKERS
+RETRIES = 2
+BACKOFF_FACTOR = 0.5  # 0.5s, 1s between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_pool_size = 0
+_session_lock = threading.Lock()
+
+def _build_adapter(pool_size):
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+    )
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+def get_session(pool_size=POOL_SIZE):
+    """
+    Returns the process-wide session, with a connection pool of at least pool_size.
+    Connection pools are thread-safe, so all scraper threads share it.
+    """
+    global _session, _pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _pool_size:
+            adapter = _build_adapter(pool_size)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+            _pool_size = pool_size
+        return _session
+
+def fetch(url, headers=None, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+    """GET through the shared session, with retry/backoff and a timeout always set."""
+    return get_session(pool_size).get(url, headers=headers, timeout=timeout)
@@ -0,0 +1,69 @@
+import html
+import re
+
+# Fast path for listing pages: pulls the ld+json script bodies and checks the
+# "no events" marker with a single regex scan, without building a DOM.
+# Gives the same results as the BeautifulSoup path (see tests/verify_ld_json.py).
+
+EMPTY_MARKER = "nu am gasit evenimente"
+
+# Attributes of a start tag: a '>' inside a quoted value does not end the tag
+_ATTRS = r'''((?:[^>"']|"[^"]*"|'[^']*')*)'''
+
+# Leftmost-first alternation, so a <script> inside a comment stays a comment and
+# a "<!--" inside a script stays script text, like html.parser does.
+_RAW_BLOCK_RE = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    r'|<(script|style)\b' + _ATTRS + r'>(.*?)(?:</\1\s*>|\Z)',
+    re.S | re.I,
+)
+_ATTR_RE = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?''')
+_TAG_RE = re.compile(r'<' + _ATTRS + r'>')
+
+def decode(content):
+    if isinstance(content, str):
+        return content
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return content.decode('cp1252', errors='replace')
+
+def _type_attr(attrs):
+    # Whole attributes, so data-type="..." or type=... inside another value don't count.
+    # A repeated attribute keeps its last value, as in BeautifulSoup.
+    value = None
+    for m in _ATTR_RE.finditer(attrs):
+        if m.group(1).lower() == 'type':
+            value = next((g for g in m.groups()[1:] if g is not None), '')
+    return html.unescape(value) if value is not None else None
+
+def _has_empty_marker(text, blocks):
+    # Cheap reject: the marker can't be in the visible text if it isn't in the page at all
+    if "gasit" not in text.lower():
+        return False
+    # Visible text = page minus comments/scripts/styles and tags, with entities decoded
+    visible = []
+    pos = 0
+    for start, end in blocks:
+        visible.append(text[pos:start])
+        pos = end
+    visible.append(text[pos:])
+    visible_text = html.unescape(_TAG_RE.sub('', ''.join(visible)))
+    return EMPTY_MARKER in visible_text.lower()
+
+def extract(content):
+    """
+    Returns (is_empty, ld_json_bodies) for a listing page.
+    is_empty is True when the page says "nu am gasit evenimente".
+    """
+    text = decode(content)
+    blocks = []
+    bodies = []
+    for m in _RAW_BLOCK_RE.finditer(text):
+        blocks.append(m.span())
+        if m.group(1) and m.group(1).lower() == 'script' and _type_attr(m.group(2)) == 'application/ld+json':
+            bodies.append(m.group(3))
+
+    if _has_empty_marker(text, blocks):
+        return True, []
+    return False, bodies
@@ -1,8 +1,12 @@
-import requests
 from bs4 import BeautifulSoup
 import json
+from scrapers.http_session import fetch
 
 class LocationScraper:
+    def estimate_requests(self, city):
+        """Upper bound of outbound requests a get_locations(city) call will make."""
+        return 0 if city == 'all' else 1
+
     def get_locations(self, city):
         # Allow 'all' but return empty or top venues?
         if city == 'all':
@@ -15,7 +19,7 @@ class LocationScraper:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers)
+            response = fetch(url, headers=headers)
             soup = BeautifulSoup(response.content, 'html.parser')
             
             locations = []
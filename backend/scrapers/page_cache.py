@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Validators of the listing pages fetched so far, keyed by page URL.
+# Lets a refresh send conditional requests and skip parsing pages that
+# did not change since the previous crawl.
+
+MAX_PAGES = 2000  # ~30 pages for each of the busiest cities
+
+def content_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+class PageValidators:
+    def __init__(self, max_pages=MAX_PAGES):
+        self.max_pages = max_pages
+        self._pages = OrderedDict()  # url -> {etag, last_modified, hash, events}
+        self._lock = threading.Lock()
+        self.stats = {"not_modified": 0, "unchanged": 0, "parsed": 0}
+
+    def conditional_headers(self, url):
+        with self._lock:
+            entry = self._pages.get(url)
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _reuse(self, url, stat):
+        with self._lock:
+            entry = self._pages.get(url)
+            if entry is None:
+                return None
+            self._pages.move_to_end(url)
+            self.stats[stat] += 1
+        # Copies, so callers can't change what the next crawl gets back
+        return [dict(e) for e in entry['events']]
+
+    def not_modified(self, url):
+        """Events of the previous version of a page that answered 304, or None if unknown."""
+        return self._reuse(url, "not_modified")
+
+    def unchanged(self, url, digest):
+        """Events of the previous version of a page if its content hash is the same."""
+        with self._lock:
+            entry = self._pages.get(url)
+            if entry is None or entry['hash'] != digest:
+                return None
+        return self._reuse(url, "unchanged")
+
+    def store(self, url, etag, last_modified, digest, events):
+        with self._lock:
+            self.stats["parsed"] += 1
+            self._pages[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'hash': digest,
+                'events': [dict(e) for e in events],
+            }
+            self._pages.move_to_end(url)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, pages=len(self._pages))
+
+page_validators = PageValidators()
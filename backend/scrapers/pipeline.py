@@ -0,0 +1,228 @@
+import os
+import queue
+import threading
+import time
+import concurrent.futures
+import multiprocessing
+
+from scrapers.event_scraper import EventScraper, BASE_URL, parse_page
+from scrapers.http_session import fetch
+from scrapers.page_cache import page_validators, content_hash
+
+# Two-stage crawl: I/O threads only download page bytes and push them onto a
+# bounded queue; a dispatcher hands them to a process pool that runs
+# parse_page, so parsing is not serialized behind the GIL.
+
+FETCH_WORKERS = 10
+PARSE_WORKERS = os.cpu_count() or 2
+QUEUE_DEPTH = 32
+
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_users = {}  # pool -> pipelines still submitting to it
+_process_pool_lock = threading.Lock()
+
+def acquire_process_pool(workers=PARSE_WORKERS):
+    """
+    Process pool shared by every pipeline; started once, replaced by a bigger
+    one if asked for more workers. Pair with release_process_pool: a replaced
+    pool is only shut down once the last pipeline using it is done.
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or workers > _process_pool_workers:
+            old = _process_pool
+            # spawn: forking a threaded server process is not safe
+            _process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _process_pool_workers = workers
+            if old is not None and not _process_pool_users.get(old):
+                old.shutdown(wait=False)
+        _process_pool_users[_process_pool] = _process_pool_users.get(_process_pool, 0) + 1
+        return _process_pool
+
+def release_process_pool(pool):
+    with _process_pool_lock:
+        _process_pool_users[pool] -= 1
+        if _process_pool_users[pool] == 0:
+            del _process_pool_users[pool]
+            if pool is not _process_pool:
+                pool.shutdown(wait=False)  # parses already submitted still finish
+
+def _timed_parse(content, is_global):
+    t0 = time.perf_counter()
+    events = parse_page(content, is_global)
+    return events, time.perf_counter() - t0
+
+class ParsePipeline:
+    """
+    Fetch stage (thread pool) -> bounded queue -> parse stage (process pool).
+    submit_page() returns a future that resolves to the page's events, with the
+    same [] / None conventions as EventScraper.scrape_page.
+    """
+    def __init__(self, scraper, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, queue_depth=QUEUE_DEPTH):
+        self.scraper = scraper
+        self.parse_workers = parse_workers
+        self._fetchers = concurrent.futures.ThreadPoolExecutor(max_workers=fetch_workers)
+        self._processes = acquire_process_pool(parse_workers)
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._parse_slots = threading.Semaphore(parse_workers)
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'fetch_workers': fetch_workers,
+            'parse_workers': parse_workers,
+            'queue_depth': queue_depth,
+            'max_queue_depth': 0,
+            'queue_wait': 0.0,
+            'fetch_time': 0.0,
+            'parse_time': 0.0,
+            'pages_parsed': 0,
+            'pages_reused': 0,
+        }
+        self._dispatcher = threading.Thread(target=self._dispatch, name="parse-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _add_metric(self, name, value):
+        with self._metrics_lock:
+            self.metrics[name] += value
+
+    def submit_page(self, city, page):
+        result = concurrent.futures.Future()
+        self._fetchers.submit(self._fetch_stage, city, page, result)
+        return result
+
+    def _fetch_stage(self, city, page, result):
+        if not result.set_running_or_notify_cancel():
+            return
+        url = self.scraper.page_url(city, page)
+        t0 = time.perf_counter()
+        try:
+            headers = {'User-Agent': 'Mozilla/5.0'}
+            headers.update(page_validators.conditional_headers(url))
+            response = fetch(url, headers=headers, pool_size=self.metrics['fetch_workers'])
+        except Exception:
+            result.set_result(None)
+            return
+        finally:
+            self._add_metric('fetch_time', time.perf_counter() - t0)
+
+        status = response.status_code
+        if status == 404:
+            result.set_result([])
+        elif status == 304:
+            self._add_metric('pages_reused', 1)
+            result.set_result(page_validators.not_modified(url))
+        elif status != 200:
+            result.set_result(None)
+        else:
+            digest = content_hash(response.content)
+            events = page_validators.unchanged(url, digest)
+            if events is not None:
+                self._add_metric('pages_reused', 1)
+                result.set_result(events)
+                return
+            item = (time.perf_counter(), result, city, url, response.content,
+                    response.headers.get('ETag'), response.headers.get('Last-Modified'), digest)
+            # Blocks when the parsers are behind, which throttles the fetchers
+            self._queue.put(item)
+            with self._metrics_lock:
+                self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], self._queue.qsize())
+
+    def _dispatch(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                # Nothing more will be submitted: the pool may go once every pipeline is done with it
+                release_process_pool(self._processes)
+                return
+            enqueued, result, city, url, content, etag, last_modified, digest = item
+            self._parse_slots.acquire()
+            self._add_metric('queue_wait', time.perf_counter() - enqueued)
+            try:
+                parse_future = self._processes.submit(_timed_parse, content, city == 'all')
+            except Exception:
+                self._parse_slots.release()
+                result.set_result(None)
+                continue
+
+            def on_parsed(f, result=result, url=url, etag=etag, last_modified=last_modified, digest=digest):
+                self._parse_slots.release()
+                try:
+                    events, parse_time = f.result()
+                except Exception:
+                    result.set_result(None)
+                    return
+                page_validators.store(url, etag, last_modified, digest, events)
+                self._add_metric('parse_time', parse_time)
+                self._add_metric('pages_parsed', 1)
+                result.set_result(events)
+
+            parse_future.add_done_callback(on_parsed)
+
+    def get_metrics(self):
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        metrics['queue_size'] = self._queue.qsize()
+        for name in ('queue_wait', 'fetch_time', 'parse_time'):
+            metrics[name] = round(metrics[name], 3)
+        return metrics
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self._fetchers.shutdown(wait=wait, cancel_futures=cancel_futures)
+        self._queue.put(None)
+        if wait:
+            self._dispatcher.join()
+
+class PipelineEventScraper(EventScraper):
+    """EventScraper whose pages go through a ParsePipeline; the process pool is shared."""
+    def __init__(self, base_url=BASE_URL, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, queue_depth=QUEUE_DEPTH):
+        super().__init__(base_url)
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.queue_depth = queue_depth
+        self._pipeline = None
+        self.last_metrics = None
+
+    def open_executor(self):
+        return _Borrowed(self._pipeline)
+
+    def submit_page(self, executor, city, page):
+        return executor.submit_page(city, page)
+
+    def _run(self, crawl):
+        pipeline = ParsePipeline(self, self.fetch_workers, self.parse_workers, self.queue_depth)
+        self._pipeline = pipeline
+        try:
+            return crawl()
+        finally:
+            self._pipeline = None
+            pipeline.shutdown(wait=True)
+            self.last_metrics = pipeline.get_metrics()
+            print(f"[pipeline] {self.last_metrics}")
+
+    def get_events(self, city, engine='pipeline'):
+        if engine != 'pipeline':
+            return super().get_events(city, engine)
+        return self._run(lambda: EventScraper.get_events(self, city))
+
+    def get_events_many(self, cities):
+        """Crawls several cities at once through one shared fetch/parse pipeline. Returns {city: events}."""
+        cities = list(cities)
+
+        def crawl():
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(cities)) as coordinators:
+                results = coordinators.map(lambda city: EventScraper.get_events(self, city), cities)
+                return dict(zip(cities, results))
+
+        return self._run(crawl)
+
+class _Borrowed:
+    """Lets a crawl use the scraper's pipeline without shutting it down at the end."""
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def submit_page(self, city, page):
+        return self.pipeline.submit_page(city, page)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
@@ -0,0 +1,124 @@
+import re
+from collections import Counter
+
+from text_utils import fold, within_one_edit
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Dropped from venue keys altogether
+STOP_WORDS = {'a', 'al', 'and', 'cu', 'de', 'din', 'in', 'la', 'of', 'pe', 'pentru', 'si', 'the'}
+
+# Kind-of-venue words: kept in the key, but a name that differs only by them is
+# the same venue ("Club Control" / "Control").
+WEAK_WORDS = {
+    'bar', 'bistro', 'cafe', 'cinema', 'club', 'clubul', 'garden', 'hall', 'lounge', 'pub',
+    'restaurant', 'sala', 'teatrul', 'teatru', 'theatre', 'theater',
+}
+
+# Other names cities go by on iabilet
+CITY_ALIASES = {'bucuresti': {'bucharest'}}
+
+MIN_TYPO_LENGTH = 6  # shorter words ("mojo" / "mono") must match exactly
+MAX_TYPOS = 2  # words per name that may be one edit off ("nationl" / "national")
+
+def venue_tokens(name, city=None):
+    """
+    Diacritic-folded words of a venue name, without punctuation, stop words
+    and the city's own name ("Control Club - București" in bucuresti -> control, club).
+    Single letters stay: they tell "Sala B" from "Sala C".
+    """
+    tokens = [t for t in TOKEN_RE.findall(fold(name or '')) if t not in STOP_WORDS]
+    city_tokens = set(TOKEN_RE.findall(fold(city))) | CITY_ALIASES.get(city, set()) if city else set()
+    stripped = [t for t in tokens if t not in city_tokens]
+    # A venue called just "Sibiu" keeps its name
+    return frozenset(stripped or tokens)
+
+def _key(tokens):
+    """Normalized venue name: the sorted token set, so word order does not matter."""
+    return ' '.join(sorted(tokens))
+
+def _is_near(tokens, other_tokens):
+    """Same words give or take venue-kind words, or the same number of words with a typo or two."""
+    if tokens == other_tokens:
+        return True
+    small, large = sorted((tokens, other_tokens), key=len)
+    if small <= large and small - WEAK_WORDS and large - small <= WEAK_WORDS:
+        return True
+
+    only_here, only_there = sorted(tokens - other_tokens), sorted(other_tokens - tokens)
+    if len(only_here) != len(only_there) or len(only_here) > MAX_TYPOS:
+        return False
+    unpaired = list(only_there)
+    for word in only_here:
+        twin = next((w for w in unpaired if len(word) >= MIN_TYPO_LENGTH and within_one_edit(word, w)), None)
+        if twin is None:
+            return False
+        unpaired.remove(twin)
+    return True
+
+class VenueIndex:
+    """
+    The venues of one city under their normalized keys, with an inverted index
+    from tokens to keys. A lookup only compares a name with the venues that
+    share a word with it, so merging k new venues is O(k), not O(n).
+    """
+    def __init__(self, city, venues=(), deduped=False):
+        """deduped=True skips the near-duplicate check, for venues read back from the store."""
+        self.city = city
+        self._venues = {}  # key -> venue
+        self._tokens = {}  # key -> token set
+        self._postings = {}  # token -> {keys}
+        self._sorted = None
+        for venue in venues:
+            if deduped:
+                self._insert(venue)
+            else:
+                self.add(venue)
+
+    def __len__(self):
+        return len(self._venues)
+
+    def match(self, name):
+        """The known venue that name refers to (same key or a near-duplicate), or None."""
+        tokens = venue_tokens(name, self.city)
+        key = _key(tokens)
+        venue = self._venues.get(key)
+        if venue is not None or not tokens:
+            return venue
+
+        # Only venues sharing all but MAX_TYPOS words of the shorter name can be
+        # near-duplicates; the ones sharing the most words are tried first
+        shared = Counter()
+        for token in tokens:
+            shared.update(self._postings.get(token, ()))
+        candidates = [other for other, count in shared.items()
+                      if count >= min(len(tokens), len(self._tokens[other])) - MAX_TYPOS]
+        for other in sorted(candidates, key=lambda other: (-shared[other], other)):
+            if _is_near(tokens, self._tokens[other]):
+                return self._venues[other]
+        return None
+
+    def add(self, venue):
+        """Adds a venue unless it is a near-duplicate. Returns the existing venue in that case, else None."""
+        existing = self.match(venue['name'])
+        if existing is not None:
+            return existing
+        self._insert(venue)
+        return None
+
+    def _insert(self, venue):
+        tokens = venue_tokens(venue['name'], self.city)
+        key = _key(tokens)
+        if key in self._venues:
+            return
+        self._venues[key] = venue
+        self._tokens[key] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(key)
+        self._sorted = None
+
+    def venues(self):
+        """All venues, sorted by name (cached until the next add)."""
+        if self._sorted is None:
+            self._sorted = sorted(self._venues.values(), key=lambda x: x['name'])
+        return self._sorted
@@ -1,27 +1,151 @@
+import atexit
 import json
 import os
+import threading
 
+from db import SQLiteDB
+from venue_index import VenueIndex
+
+# Venue history lives in SQLite (WAL) so every gunicorn worker shares one copy.
+# venues_db.json is only the seed for a fresh database.
 VENUE_DB_FILE = os.path.join(os.path.dirname(__file__), 'venues_db.json')
+VENUE_DB_PATH = os.environ.get("VENUE_DB_PATH", os.path.join(os.path.dirname(__file__), 'venues.db'))
+
+# Write-behind: requests only update memory, dirty cities are flushed in one
+# batch every VENUE_FLUSH_INTERVAL seconds and at interpreter exit.
+VENUE_FLUSH_INTERVAL = float(os.environ.get("VENUE_FLUSH_INTERVAL", 5))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    city TEXT NOT NULL,         -- city slug, '_global' for the stand-up listing
+    name_key TEXT NOT NULL,     -- lowercased name
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    is_derived INTEGER NOT NULL,
+    PRIMARY KEY (city, name_key)
+) WITHOUT ROWID;
+
+-- Bumped whenever venues are added to a city, so workers know to reload its index
+CREATE TABLE IF NOT EXISTS venue_cities (
+    city TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+def _row(city, venue):
+    return (city, venue['name'].lower(), venue['name'], venue['url'], 1 if venue.get('is_derived') else 0)
 
 class VenueStore:
-    def __init__(self):
-        self.db = self._load_db()
-
-    def _load_db(self):
-        if not os.path.exists(VENUE_DB_FILE):
-            return {"_global": []} # Structure: {"city_slug": [{"name": "...", "url": "..."}]}
-        try:
-            with open(VENUE_DB_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return {"_global": []}
-
-    def _save_db(self):
-        try:
-            with open(VENUE_DB_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.db, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving venue DB: {e}")
+    def __init__(self, path=VENUE_DB_PATH, flush_interval=VENUE_FLUSH_INTERVAL, seed_file=VENUE_DB_FILE):
+        self.db = SQLiteDB(path, SCHEMA)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()  # guards _pending and _indexes
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # city -> VenueIndex of venues not yet written
+        self._indexes = {}  # city -> (version, VenueIndex of the stored venues)
+        self._flusher = None
+        self._stop = threading.Event()
+        self._seed(seed_file)
+        atexit.register(self.close)
+
+    def _seed(self, seed_file):
+        """Imports the JSON venue history into an empty database (once, whichever worker gets there first)."""
+        if not seed_file or not os.path.exists(seed_file):
+            return
+        with self.db.transaction() as conn:
+            if conn.execute("SELECT 1 FROM venues LIMIT 1").fetchone():
+                return
+            try:
+                with open(seed_file, 'r', encoding='utf-8') as f:
+                    seed = json.load(f)
+            except Exception as e:
+                print(f"Error reading venue seed {seed_file}: {e}")
+                return
+            # Near-duplicates in the JSON history are dropped on the way in
+            rows = [_row(city, v) for city, venues in seed.items() for v in VenueIndex(city, venues).venues()]
+            conn.executemany("INSERT OR IGNORE INTO venues VALUES (?, ?, ?, ?, ?)", rows)
+        print(f"Seeded venue DB with {len(rows)} venues from {os.path.basename(seed_file)}")
+
+    def _load_index(self, conn, city):
+        rows = conn.execute("SELECT name, url, is_derived FROM venues WHERE city = ? ORDER BY name", (city,))
+        return VenueIndex(city, ({"name": name, "url": url, "is_derived": bool(is_derived)}
+                                 for name, url, is_derived in rows), deduped=True)
+
+    def _version(self, conn, city):
+        row = conn.execute("SELECT version FROM venue_cities WHERE city = ?", (city,)).fetchone()
+        return row[0] if row else 0
+
+    def _index(self, city):
+        """The city's stored venues, reloaded only after some worker added to them."""
+        conn = self.db.connection()
+        version = self._version(conn, city)
+        with self._lock:
+            cached = self._indexes.get(city)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = self._load_index(conn, city)
+        with self._lock:
+            self._indexes[city] = (version, index)
+        return index
+
+    def flush(self):
+        """
+        Writes the pending venues in one transaction. Each one is checked against
+        the city's venues as stored right now, so near-duplicates another worker
+        already added are skipped, never overwritten. Returns how many venues were new.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                pending = self._pending
+                self._pending = {}
+
+            added = 0
+            reloaded = {}
+            try:
+                with self.db.transaction() as conn:
+                    for city, venues in pending.items():
+                        index = self._load_index(conn, city)
+                        new = [v for v in venues.venues() if index.add(v) is None]
+                        before = conn.total_changes
+                        conn.executemany("INSERT OR IGNORE INTO venues VALUES (?, ?, ?, ?, ?)",
+                                         [_row(city, v) for v in new])
+                        if conn.total_changes > before:
+                            added += conn.total_changes - before
+                            conn.execute(
+                                "INSERT INTO venue_cities (city, version) VALUES (?, 1) "
+                                "ON CONFLICT(city) DO UPDATE SET version = version + 1", (city,))
+                        reloaded[city] = (self._version(conn, city), index)
+            except Exception as e:
+                print(f"Error saving venue DB: {e}")
+                with self._lock:
+                    for city, venues in pending.items():
+                        # Retried on the next flush
+                        retry = self._pending.setdefault(city, VenueIndex(city))
+                        for venue in venues.venues():
+                            retry.add(venue)
+                return 0
+
+            with self._lock:
+                self._indexes.update(reloaded)
+            if added:
+                print(f"Saved {added} new venues ({', '.join(sorted(pending))})")
+            return added
+
+    def _mark_dirty(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="venue-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Stops the background flusher and writes whatever is still pending."""
+        self._stop.set()
+        self.flush()
 
     def add_venues_from_events(self, city_slug, events):
         """
@@ -36,44 +160,76 @@ class VenueStore:
         else:
             target_key = city_slug
 
-        if target_key not in self.db:
-            self.db[target_key] = []
-
-        existing_names = {v['name'].lower() for v in self.db[target_key]}
-        added = 0
-        
-        for e in events:
-            loc_name = e.get('location')
-            loc_url = e.get('location_url')
-            
-            if not loc_name: continue
-            
-            # Skip if exists
-            if loc_name.lower() in existing_names:
-                continue
-
-            # Construct new venue entry
-            # If no URL, generate search URL
-            final_url = loc_url if loc_url else f"https://www.iabilet.ro/cauta/?q={loc_name}"
-
-            new_venue = {
-                "name": loc_name,
-                "url": final_url,
-                "is_derived": True
-            }
-            
-            self.db[target_key].append(new_venue)
-            existing_names.add(loc_name.lower())
-            added += 1
-            
-        if added > 0:
-            self.db[target_key].sort(key=lambda x: x['name'])
-            self._save_db()
-            print(f"[{city_slug}] Added {added} new venues to history.")
+        index = self._index(target_key)
+        with self._lock:
+            pending = self._pending.setdefault(target_key, VenueIndex(target_key))
+            for e in events:
+                loc_name = e.get('location')
+                loc_url = e.get('location_url')
+
+                if not loc_name: continue
+
+                # Skip if exists (under a normalized or near-duplicate name too)
+                if index.match(loc_name) is not None:
+                    continue
+
+                # Construct new venue entry
+                # If no URL, generate search URL
+                final_url = loc_url if loc_url else f"https://www.iabilet.ro/cauta/?q={loc_name}"
+
+                pending.add({
+                    "name": loc_name,
+                    "url": final_url,
+                    "is_derived": True
+                })
+            if not len(pending):
+                del self._pending[target_key]
+            else:
+                self._mark_dirty()
+
+    def _unsaved(self, city_slug, index):
+        with self._lock:
+            pending = self._pending.get(city_slug)
+            if pending is None:
+                return []
+            return [v for v in pending.venues() if index.match(v['name']) is None]
 
     def get_venues(self, city_slug):
         """Returns list of venues for city + any relevant global ones?"""
-        # Return specific city venues
-        return self.db.get(city_slug, [])
+        # Return specific city venues, including ones not flushed yet
+        index = self._index(city_slug)
+        unsaved = self._unsaved(city_slug, index)
+        if not unsaved:
+            return list(index.venues())
+        return sorted(index.venues() + unsaved, key=lambda x: x['name'])
+
+    def merge_venues(self, city_slug, venues):
+        """
+        The city's venues plus those of `venues` not already known under the
+        same normalized or a near-duplicate name, sorted by name. Only the new
+        venues are looked up, the stored list is not rescanned.
+        """
+        index = self._index(city_slug)
+        extra = VenueIndex(city_slug)
+        for venue in self._unsaved(city_slug, index):
+            extra.add(venue)
+        for venue in venues:
+            if index.match(venue['name']) is None:
+                extra.add(venue)
+        if not len(extra):
+            return list(index.venues())
+        return sorted(index.venues() + extra.venues(), key=lambda x: x['name'])
+
+    def stats(self):
+        with self._lock:
+            pending = sum(len(v) for v in self._pending.values())
+            indexed = len(self._indexes)
+        conn = self.db.connection()
+        return {
+            "venues": conn.execute("SELECT COUNT(*) FROM venues").fetchone()[0],
+            "cities": conn.execute("SELECT COUNT(DISTINCT city) FROM venues").fetchone()[0],
+            "pending": pending,
+            "indexed_cities": indexed,
+        }
 
 venue_store = VenueStore()
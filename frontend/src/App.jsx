@@ -38,61 +38,83 @@ function App() {
 
 
 
-  // Fetch data when city changes (Race Condition Safe)
+  // Visible calendar range ({ from, to } as YYYY-MM-DD), set by FullCalendar
+  const [range, setRange] = useState(null);
+  const [scrapedLocations, setScrapedLocations] = useState([]);
+  const [standupVenues, setStandupVenues] = useState([]);
+  const loadedCity = React.useRef(null);
+
+  const toISODate = (d) => `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+
+  const handleDatesSet = (arg) => {
+    // FullCalendar's end is exclusive
+    const last = new Date(arg.end);
+    last.setDate(last.getDate() - 1);
+    const next = { from: toISODate(arg.start), to: toISODate(last) };
+    setRange(prev => (prev && prev.from === next.from && prev.to === next.to) ? prev : next);
+  };
+
+  // Fetch venues when city changes (Race Condition Safe)
   useEffect(() => {
     let active = true;
+    setScrapedLocations([]);
+    setStandupVenues([]);
 
-    const fetchData = async () => {
+    axios.get(`https://show-backend-vhwo.onrender.com/api/locations?city=${city.slug}`)
+      .then(res => { if (active) setScrapedLocations(res.data); })
+      .catch(error => { if (active) console.error("Error fetching venues", error); });
+
+    // Venues of every stand-up event in the city, not just the visible range
+    axios.get('https://show-backend-vhwo.onrender.com/api/events', {
+      params: { city: city.slug, standup_only: 1, fields: 'location' }
+    })
+      .then(res => { if (active) setStandupVenues(res.data.map(event => event.location)); })
+      .catch(error => { if (active) console.error("Error fetching stand-up venues", error); });
+
+    return () => { active = false; };
+  }, [city]);
+
+  // Fetch only the visible range of events when city or calendar range changes.
+  // Events come over Server-Sent Events: a city that isn't cached yet fills in
+  // page by page while the backend scrapes it.
+  useEffect(() => {
+    if (!range) return;
+    let active = true;
+    const isNewCity = loadedCity.current !== city.slug;
+    const params = {
+      city: city.slug,
+      from: range.from,
+      to: range.to,
+      fields: 'title,start_date,end_date,url,is_standup,location,image'
+    };
+
+    const toCalendarEvent = event => ({
+      title: event.title,
+      start: event.start_date,
+      end: event.end_date,
+      url: event.url,
+      backgroundColor: event.is_standup ? '#ff2a6d' : '#222',
+      borderColor: event.is_standup ? '#ff2a6d' : '#333',
+      textColor: '#fff',
+      extendedProps: {
+        location: event.location || 'Unknown', // Fixed key
+        is_standup: event.is_standup,
+        image: event.image
+      }
+    });
+
+    if (isNewCity) {
       setLoading(true);
       setEvents([]);
-      setLocations([]);
+    }
 
+    // Plain request, for browsers without EventSource or when the stream fails
+    const fetchData = async () => {
       try {
-        const [eventRes, locRes] = await Promise.all([
-          axios.get(`https://show-backend-vhwo.onrender.com/api/events?city=${city.slug}`),
-          axios.get(`https://show-backend-vhwo.onrender.com/api/locations?city=${city.slug}`)
-        ]);
-
+        const eventRes = await axios.get('https://show-backend-vhwo.onrender.com/api/events', { params });
         if (active) {
-          const calendarEvents = eventRes.data.map(event => ({
-            title: event.title,
-            start: event.start_date,
-            end: event.end_date,
-            url: event.url,
-            backgroundColor: event.is_standup ? '#ff2a6d' : '#222',
-            borderColor: event.is_standup ? '#ff2a6d' : '#333',
-            textColor: '#fff',
-            extendedProps: {
-              location: event.location || 'Unknown', // Fixed key
-              is_standup: event.is_standup,
-              image: event.image
-            }
-          }));
-
-          // ENHANCEMENT: Derive venues from actual events
-          const derivedLocations = [];
-          const existingNames = new Set(locRes.data.map(l => l.name.toLowerCase()));
-
-          calendarEvents.forEach(ev => {
-            if (ev.extendedProps.is_standup && ev.extendedProps.location && ev.extendedProps.location !== 'Unknown') {
-              const locName = ev.extendedProps.location;
-              if (!existingNames.has(locName.toLowerCase())) {
-                existingNames.add(locName.toLowerCase());
-                derivedLocations.push({
-                  name: locName,
-                  // Fallback URL: Search for the venue on iabilet
-                  url: `https://www.iabilet.ro/cauta/?q=${encodeURIComponent(locName)}`
-                });
-              }
-            }
-          });
-
-          // Merge scraped venues (high quality) with derived venues (comprehensive)
-          // Sort alphabetically for niceness
-          const allLocs = [...locRes.data, ...derivedLocations].sort((a, b) => a.name.localeCompare(b.name));
-
-          setLocations(allLocs);
-          setEvents(calendarEvents);
+          loadedCity.current = city.slug;
+          setEvents(eventRes.data.map(toCalendarEvent));
         }
       } catch (error) {
         if (active) console.error("Error fetching data", error);
@@ -101,9 +123,61 @@ function App() {
       }
     };
 
-    fetchData();
-    return () => { active = false; };
-  }, [city]);
+    if (typeof EventSource === 'undefined') {
+      fetchData();
+      return () => { active = false; };
+    }
+
+    let received = [];
+    const source = new EventSource(
+      `https://show-backend-vhwo.onrender.com/api/events/stream?${new URLSearchParams(params)}`
+    );
+    source.addEventListener('events', (message) => {
+      if (!active) return;
+      received = received.concat(JSON.parse(message.data).map(toCalendarEvent));
+      loadedCity.current = city.slug;
+      setEvents(received);
+      setLoading(false);
+    });
+    source.addEventListener('done', () => {
+      source.close();
+      if (!active) return;
+      loadedCity.current = city.slug;
+      setEvents(received);
+      setLoading(false);
+    });
+    source.onerror = () => {
+      // EventSource would reconnect and replay the stream on its own; ask once the plain way instead
+      source.close();
+      if (active) fetchData();
+    };
+
+    return () => {
+      active = false;
+      source.close();
+    };
+  }, [city, range]);
+
+  // ENHANCEMENT: Derive venues from actual events
+  useEffect(() => {
+    const derivedLocations = [];
+    const existingNames = new Set(scrapedLocations.map(l => l.name.toLowerCase()));
+
+    standupVenues.forEach(locName => {
+      if (locName && !existingNames.has(locName.toLowerCase())) {
+        existingNames.add(locName.toLowerCase());
+        derivedLocations.push({
+          name: locName,
+          // Fallback URL: Search for the venue on iabilet
+          url: `https://www.iabilet.ro/cauta/?q=${encodeURIComponent(locName)}`
+        });
+      }
+    });
+
+    // Merge scraped venues (high quality) with derived venues (comprehensive)
+    // Sort alphabetically for niceness
+    setLocations([...scrapedLocations, ...derivedLocations].sort((a, b) => a.name.localeCompare(b.name)));
+  }, [scrapedLocations, standupVenues]);
 
   // Artist Filtering State
   // Artist Filtering State
@@ -114,23 +188,10 @@ function App() {
   useEffect(() => {
     async function loadGlobalArtists() {
       try {
-        // Fetch global stand-up events to populate the master artist list
-        // We use a separate request so it doesn't block the initial city load
-        const res = await axios.get('https://show-backend-vhwo.onrender.com/api/events?city=all');
-
-        const extracted = new Set();
-        res.data.forEach(e => {
-          // Use the same regex logic
-          // We rely on the scraper's 'is_standup' implicit flag for city=all
-          const title = e.title;
-          let match = title.match(/(?:cu|show|featuring|starring)\s+([A-ZĂÂÎȘȚ][a-zA-Zăâîșț\s&-]+)/i);
-
-          if (match && match[1]) {
-            let name = match[1].trim();
-            if (name.length < 25) extracted.add(name);
-          }
-        });
-        setGlobalArtists(Array.from(extracted).sort());
+        // The backend indexes artists at scrape time; we only need the names
+        // of the global stand-up listing for the master artist list
+        const res = await axios.get('https://show-backend-vhwo.onrender.com/api/artists?city=all');
+        setGlobalArtists(res.data.map(a => a.name));
       } catch (e) {
         console.error("Error loading global artists", e);
       }
@@ -348,6 +409,7 @@ function App() {
               <FullCalendar
                 plugins={[dayGridPlugin, timeGridPlugin, interactionPlugin]}
                 initialView="dayGridMonth"
+                datesSet={handleDatesSet}
                 events={filteredEvents}
                 firstDay={1} /* Start on Monday */
                 locale="ro"  /* Romanian Locale */
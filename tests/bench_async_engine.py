@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import threading
+import concurrent.futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from scrapers.event_scraper import EventScraper
+from scrapers.async_engine import AsyncEventScraper, AsyncRateLimiter
+from scrapers.http_session import get_session
+from fixture_server import FixtureServer, load_recorded_events
+
+CITIES = ['bucuresti', 'cluj-napoca', 'timisoara', 'iasi', 'sibiu', 'brasov', 'constanta', 'oradea']
+# The fixture serves any city slug; the second round is a 6x wider crawl
+SCALES = [1, 6]
+EVENTS = 240  # 10 pages per city
+RESPONSE_DELAY = 0.2  # emulated server time per page
+
+def client_threads():
+    # The fixture server runs in this process too; leave its threads out
+    return sum(1 for t in threading.enumerate() if 'process_request_thread' not in t.name)
+
+class ThreadSampler:
+    """Samples the number of live client threads while a crawl runs."""
+    def __init__(self):
+        self.peak = client_threads()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, client_threads())
+            time.sleep(0.005)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def crawl_with_threads(base_url, cities):
+    # One 10-thread crawl per city, all cities at once
+    get_session(pool_size=len(cities) * EventScraper.MAX_WORKERS)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(cities)) as executor:
+        futures = {city: executor.submit(EventScraper(base_url).get_events, city) for city in cities}
+        return {city: f.result() for city, f in futures.items()}
+
+def crawl_with_async(base_url, cities):
+    scraper = AsyncEventScraper(
+        base_url,
+        max_concurrency=len(cities) * EventScraper.MAX_WORKERS,
+        rate_limiter=AsyncRateLimiter(rate=10000, burst=1000),
+    )
+    return scraper.get_events_many(cities)
+
+def bench_async_engine():
+    server = FixtureServer(load_recorded_events()[:EVENTS], response_delay=RESPONSE_DELAY)
+    base_url = server.start()
+    ok = True
+    try:
+        for scale in SCALES:
+            cities = [f"{city}-{i}" if i else city for i in range(scale) for city in CITIES]
+            print(f"🧪 Multi-city crawl: {len(cities)} cities, thread pool vs asyncio engine...")
+            results = {}
+            for name, crawl in [("thread pool", crawl_with_threads), ("asyncio", crawl_with_async)]:
+                EventScraper._page_hints.clear()
+                requests_before = server.requests
+                with ThreadSampler() as sampler:
+                    t0 = time.perf_counter()
+                    results[name] = crawl(base_url, cities)
+                    elapsed = time.perf_counter() - t0
+                total = sum(len(v) for v in results[name].values())
+                print(f"   {name:12s} {elapsed:5.2f}s, {total} events, "
+                      f"{server.requests - requests_before} requests, peak {sampler.peak} threads")
+
+            same = results["thread pool"] == results["asyncio"] and all(results["asyncio"].values())
+            print(f"   {'✅' if same else '❌'} both engines returned {'identical' if same else 'different'} events")
+            ok = ok and same
+    finally:
+        server.stop()
+
+    print("✅ Both engines agree at every scale" if ok else "❌ Engines returned different events")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_async_engine() else 1)
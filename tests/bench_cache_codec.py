@@ -0,0 +1,81 @@
+import os
+import sys
+import glob
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+import cache_codec
+from cache import CachedBody
+from compression import compute_etag, encode_body
+
+# Event lists cached by a real run, as json.dump wrote them
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'backend', 'backend', 'cache_data')
+ROUNDS = 50
+
+def timed(fn, arg):
+    """Best of 3 averages, in microseconds."""
+    best = None
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            fn(arg)
+        elapsed = (time.perf_counter() - t0) / ROUNDS * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bundle(payload_name, payload, body):
+    """What save_to_cache stores: the payload plus the ETag and compressed bodies of the JSON."""
+    return cache_codec.encode_bundle(compute_etag(body), [(payload_name, payload)] + list(encode_body(body).items()))
+
+def load(stored):
+    """A worker's read of an entry: ready to serve, and decoded for the index."""
+    return CachedBody.from_stored(stored, 0).data()
+
+def bench_cache_codec():
+    files = sorted(glob.glob(os.path.join(SAMPLES_DIR, '*.json')), key=os.path.getsize, reverse=True)
+    if not files:
+        print(f"❌ No cache entries in {SAMPLES_DIR}")
+        return False
+
+    print(f"📊 {len(files)} cached event lists: stored bundles, JSON vs cache_codec compact payload (v{cache_codec.VERSION})")
+    print(f"   {'events':>6} {'json B':>8} {'compact B':>9} {'size':>5} {'old read':>9} {'json':>7} {'compact':>8}")
+    totals = {"json_bytes": 0, "compact_bytes": 0, "old_load": 0, "json_load": 0, "compact_load": 0}
+    ok = True
+    for path in files:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        compact = cache_codec.encode_compact(data)
+        if compact is None:
+            print(f"   ⚠️  {os.path.basename(path)} does not fit the compact format, stored as JSON")
+        json_stored = bundle('json', raw, raw)
+        compact_stored = bundle('compact', compact, raw) if compact else json_stored
+
+        # Served bodies must not change (same bytes, same ETag)
+        entry = CachedBody.from_stored(compact_stored, 0)
+        if entry.body != raw or entry.etag != compute_etag(raw) or entry.data() != data:
+            print(f"   ❌ {os.path.basename(path)} does not round-trip")
+            ok = False
+
+        # Before bundles, every read hashed and recompressed the body
+        old_load = timed(lambda body: (json.loads(body), CachedBody.from_json(body, 0)), raw)
+        json_load = timed(load, json_stored)
+        compact_load = timed(load, compact_stored)
+        totals["json_bytes"] += len(json_stored)
+        totals["compact_bytes"] += len(compact_stored)
+        totals["old_load"] += old_load
+        totals["json_load"] += json_load
+        totals["compact_load"] += compact_load
+        print(f"   {len(data):>6} {len(json_stored):>8} {len(compact_stored):>9} "
+              f"{len(compact_stored) / len(json_stored):>5.0%} {old_load:>7.0f}us {json_load:>5.0f}us {compact_load:>6.0f}us")
+
+    print(f"   total: {totals['json_bytes']} -> {totals['compact_bytes']} bytes stored "
+          f"({1 - totals['compact_bytes'] / totals['json_bytes']:.0%} smaller with compact payloads)")
+    print(f"   read: {totals['old_load']:.0f}us recompressing -> {totals['json_load']:.0f}us json bundle "
+          f"({totals['old_load'] / totals['json_load']:.0f}x), {totals['compact_load']:.0f}us compact bundle")
+    print("✅ Every entry round-trips to the same JSON" if ok else "❌ Some entries changed")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_cache_codec() else 1)
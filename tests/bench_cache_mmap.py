@@ -0,0 +1,126 @@
+import os
+import sys
+import glob
+import gzip
+import json
+import tempfile
+import threading
+import tracemalloc
+import http.client
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# Keep the stores off the real databases and the janitor off the real cache
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("EVENT_DB_FILE", os.path.join(_tmp, 'events.db'))
+os.environ.setdefault("VENUE_DB_PATH", os.path.join(_tmp, 'venues.db'))
+os.environ.setdefault("CACHE_JANITOR_ENABLED", "0")
+
+import cache
+from cache import CachedBody
+from cache_backends import FileBackend
+from compression import brotli
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'backend', 'backend', 'cache_data')
+REQUESTS = 200  # responses served per entry and encoding
+ENCODINGS = [None, 'gzip'] + (['br'] if brotli is not None else [])
+
+def store(cache_dir, city, path):
+    """Saves a recorded event list the way a crawl does: a bundle with its compressed bodies."""
+    with open(path, 'rb') as f:
+        data = json.load(f)
+    cache.set_backend(FileBackend(cache_dir))
+    cache.save_to_cache('evt', city, data)
+    return cache.get_cache_key('evt', city)
+
+def serve(backend, name):
+    """Loads an entry the way a cold worker does, then writes it out REQUESTS times per encoding."""
+    entry = CachedBody.from_stored(*backend.read(name))
+    sent = 0
+    for encoding in ENCODINGS:
+        for _ in range(REQUESTS):
+            for chunk in entry.chunks(encoding):
+                sent += len(chunk)
+    return entry, sent
+
+def serve_over_http(cache_dir, city):
+    """
+    GETs the entry from /api/events on a real WSGI server, once per Accept-Encoding.
+    Returns {encoding: (status, decoded body or None)}.
+    """
+    from werkzeug.serving import make_server
+    import app as backend_app
+
+    cache.set_backend(FileBackend(cache_dir, mmap_min_bytes=1))
+    server = make_server('127.0.0.1', 0, backend_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = {}
+    try:
+        for encoding in ('identity', 'gzip', 'br'):
+            conn = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=30)
+            try:
+                conn.request('GET', f'/api/events?city={city}', headers={'Accept-Encoding': encoding})
+                response = conn.getresponse()
+                body = response.read()
+                if response.getheader('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                elif response.getheader('Content-Encoding') == 'br':
+                    body = brotli.decompress(body)
+                results[encoding] = (response.status, body)
+            except (OSError, http.client.HTTPException) as e:
+                results[encoding] = (str(e), None)
+            finally:
+                conn.close()
+    finally:
+        server.shutdown()
+    return results
+
+def measure(backend, name):
+    tracemalloc.start()
+    entry, _ = serve(backend, name)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return entry, peak
+
+def bench_cache_mmap():
+    files = sorted(glob.glob(os.path.join(SAMPLES_DIR, '*.json')), key=os.path.getsize, reverse=True)[:2]
+    if not files:
+        print(f"❌ No cache entries in {SAMPLES_DIR}")
+        return False
+
+    ok = True
+    with tempfile.TemporaryDirectory() as cache_dir:
+        copied = FileBackend(cache_dir, mmap_min_bytes=0)
+        mapped = FileBackend(cache_dir, mmap_min_bytes=1)
+        print(f"📊 Loading an entry and serving it {REQUESTS}x per encoding "
+              f"({', '.join(e or 'identity' for e in ENCODINGS)}) from one worker:")
+        for i, path in enumerate(files):
+            name = store(cache_dir, f"bench-{i}", path)
+            size = os.path.getsize(os.path.join(cache_dir, name))
+            _, heap_read = measure(copied, name)
+            entry, heap_mmap = measure(mapped, name)
+            print(f"   {size:>7} B bundle: peak heap {heap_read:>7} B with read(), {heap_mmap:>5} B with mmap")
+            ok = ok and entry.mapped and heap_mmap < size / 10
+
+            # Another worker replaces the entry: the mapping still shows the whole old file
+            original = [b''.join(entry.chunks(encoding)) for encoding in ENCODINGS]
+            mapped.write(name, b'[]', 60)
+            intact = [b''.join(entry.chunks(encoding)) for encoding in ENCODINGS] == original
+            print(f"   {'✅' if intact else '❌'} mapping unchanged after the entry was replaced")
+            ok = ok and intact
+
+        # The mapped body must survive a real server, not just the loop above
+        with open(files[0], 'rb') as f:
+            original = json.dumps(json.load(f)).encode('utf-8')
+        store(cache_dir, 'bench-mmap', files[0])
+        print("📡 Serving the mapped entry through /api/events on a WSGI server:")
+        for encoding, (status, body) in serve_over_http(cache_dir, 'bench-mmap').items():
+            good = status == 200 and body == original
+            print(f"   {'✅' if good else '❌'} Accept-Encoding: {encoding} -> {status}, "
+                  f"{len(body) if body is not None else 0}/{len(original)} bytes")
+            ok = ok and good
+
+    print("✅ Large entries are served from the page cache, not copied per worker" if ok else "❌ mmap read path failed")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_cache_mmap() else 1)
@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from city_index import CityIndex, DEFAULT_LIMIT
+
+CITIES_FILE = os.path.join(os.path.dirname(__file__), '..', 'backend', 'cities.json')
+ROUNDS = 20
+
+# Typed without diacritics and with a slip, as people do in the search box
+TYPO_QUERIES = ["bucuresti", "brasvo", "timisora", "cluj napoca", "tirgu mures", "sibu", "costanta"]
+
+def old_scan(cities, query):
+    query = query.lower().strip()
+    if not query or query == 'all':
+        return cities
+    return [c for c in cities if query in c['name'].lower()]
+
+def keystrokes(cities):
+    """Every prefix of every city name, as typed one key at a time."""
+    queries = []
+    for city in cities:
+        name = city['name'].lower()
+        queries.extend(name[:i] for i in range(1, len(name) + 1))
+    return queries
+
+def replay(search, queries):
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for q in queries:
+            search(q)
+    return (time.perf_counter() - t0) / (ROUNDS * len(queries))
+
+def bench_city_search():
+    with open(CITIES_FILE, 'r', encoding='utf-8') as f:
+        cities = json.load(f)
+
+    t0 = time.perf_counter()
+    index = CityIndex(cities)
+    print(f"🧪 Built city index over {len(cities)} cities in {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({index.stats()['keys']} keys)")
+
+    queries = keystrokes(cities)
+    print(f"🧪 Replaying {len(queries)} keystrokes x {ROUNDS} rounds...")
+    old = replay(lambda q: old_scan(cities, q), queries)
+    new = replay(lambda q: index.search(q, DEFAULT_LIMIT), queries)
+    print(f"   linear scan  {old * 1e6:7.2f} µs/query")
+    print(f"   city index   {new * 1e6:7.2f} µs/query")
+    print(f"✅ Index is {old / new:.1f}x faster per keystroke")
+
+    print("🧪 Queries without diacritics / with typos:")
+    found = 0
+    for q in TYPO_QUERIES:
+        old_hits = [c['name'] for c in old_scan(cities, q)][:3]
+        new_hits = [c['name'] for c in index.search(q, 3)]
+        found += bool(new_hits)
+        print(f"   {q!r:15s} scan: {old_hits}  index: {new_hits}")
+    print(f"✅ Index answered {found}/{len(TYPO_QUERIES)}, "
+          f"scan answered {sum(bool(old_scan(cities, q)) for q in TYPO_QUERIES)}/{len(TYPO_QUERIES)}")
+
+if __name__ == "__main__":
+    bench_city_search()
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# Keep the stores off the real databases and the janitor off the real cache
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("EVENT_DB_FILE", os.path.join(_tmp, 'events.db'))
+os.environ.setdefault("VENUE_DB_PATH", os.path.join(_tmp, 'venues.db'))
+os.environ.setdefault("CACHE_JANITOR_ENABLED", "0")
+
+import app as backend_app
+import cache
+from cache_backends import MemoryBackend
+from scrapers.event_scraper import EventScraper
+from fixture_server import FixtureServer, load_recorded_events
+
+EVENTS = 720  # 30 pages, like the real 'all' listing
+RESPONSE_DELAY = 0.3  # emulated iabilet time per page
+
+MODES = [
+    ("buffered JSON", ""),
+    ("?stream=1", "&stream=1"),
+    ("NDJSON", "&format=ndjson"),
+]
+
+def timed_get(client, url):
+    """(seconds to the first event, seconds to the end, body)"""
+    t0 = time.perf_counter()
+    response = client.get(url, buffered=False)
+    first = None
+    chunks = []
+    for chunk in response.response:
+        chunks.append(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        if first is None and sum(len(c) for c in chunks) > 2:  # more than the opening '['
+            first = time.perf_counter() - t0
+    response.close()
+    return first, time.perf_counter() - t0, b''.join(chunks)
+
+def bench_event_stream():
+    server = FixtureServer(load_recorded_events()[:EVENTS], response_delay=RESPONSE_DELAY)
+    base_url = server.start()
+    EventScraper.__init__.__defaults__ = (base_url,)
+    cache.set_backend(MemoryBackend())
+    client = backend_app.app.test_client()
+
+    print(f"🧪 Cold /api/events for {EVENTS} events ({RESPONSE_DELAY}s per listing page)...")
+    ok = True
+    try:
+        for i, (label, params) in enumerate(MODES):
+            city = f"bench-city-{i}"  # a city nobody crawled yet, so every mode scrapes
+            first, total, body = timed_get(client, f"/api/events?city={city}{params}")
+            if 'ndjson' in params:
+                events = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+            else:
+                events = json.loads(body)
+            good = len(events) == EVENTS and len({e['url'] for e in events}) == EVENTS
+            ok = ok and good
+            print(f"   {'✅' if good else '❌'} {label:<14} first event {first:.2f}s, done {total:.2f}s, {len(events)} events")
+
+        # Server-Sent Events: one 'events' message per page, then 'done' with the totals
+        first, total, body = timed_get(client, f"/api/events/stream?city=bench-city-{len(MODES)}")
+        messages = [m.split('\n', 1) for m in body.decode('utf-8').split('\n\n') if m]
+        events = [e for kind, data in messages if kind == 'event: events' for e in json.loads(data[len('data: '):])]
+        done = json.loads(messages[-1][1][len('data: '):]) if messages[-1][0] == 'event: done' else {}
+        good = len(events) == EVENTS and done.get('events') == EVENTS
+        ok = ok and good
+        print(f"   {'✅' if good else '❌'} {'SSE':<14} first event {first:.2f}s, done {total:.2f}s, "
+              f"{len(events)} events in {done.get('messages')} messages")
+
+        # Hits stream the cached list too
+        first, total, body = timed_get(client, "/api/events?city=bench-city-0&format=ndjson")
+        lines = body.decode('utf-8').splitlines()
+        good = len(lines) == EVENTS
+        ok = ok and good
+        print(f"   {'✅' if good else '❌'} NDJSON from cache: {len(lines)} lines in {total * 1000:.0f}ms")
+    finally:
+        server.stop()
+
+    print("✅ Streaming modes return the same events, the first ones much sooner" if ok else "❌ Streaming lost events")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_event_stream() else 1)
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import statistics
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from scrapers.http_session import fetch
+from fixture_server import FixtureServer
+
+PAGES = 30
+ROUNDS = 3
+HANDSHAKE_DELAY = 0.03  # emulated TCP+TLS setup per new connection
+
+def time_pages(get, base_url):
+    timings = []
+    for page in range(1, PAGES + 1):
+        t0 = time.perf_counter()
+        r = get(f"{base_url}/bilete-in-sibiu/?page={page}")
+        r.content
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+def bench_http_session():
+    print("🧪 Per-page latency: bare requests.get vs pooled session...")
+    server = FixtureServer(handshake_delay=HANDSHAKE_DELAY)
+    base_url = server.start()
+    try:
+        results = {}
+        for name, get in [
+            ("requests.get", lambda url: requests.get(url, timeout=10)),
+            ("pooled session", lambda url: fetch(url)),
+        ]:
+            conns_before = server.connections
+            timings = []
+            for _ in range(ROUNDS):
+                timings.extend(time_pages(get, base_url))
+            results[name] = statistics.median(timings)
+            print(f"   {name:15s} median {results[name] * 1000:6.1f} ms/page, "
+                  f"{server.connections - conns_before} connections for {len(timings)} pages")
+
+        speedup = results["requests.get"] / results["pooled session"]
+        print(f"✅ Pooled session is {speedup:.1f}x faster per page")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    bench_http_session()
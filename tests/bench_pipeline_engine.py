@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import concurrent.futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from scrapers.event_scraper import EventScraper
+from scrapers.pipeline import PipelineEventScraper, PARSE_WORKERS
+from scrapers.page_cache import page_validators
+from scrapers.http_session import get_session
+from fixture_server import FixtureServer, load_recorded_events
+
+CITIES = ['bucuresti', 'cluj-napoca', 'timisoara', 'iasi', 'sibiu', 'brasov']
+EVENTS = 480  # 20 pages per city
+RESPONSE_DELAY = 0.05  # emulated server time per page, short so parsing shows
+
+def crawl_with_threads(base_url):
+    # One 10-thread crawl per city, all cities at once
+    get_session(pool_size=len(CITIES) * EventScraper.MAX_WORKERS)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(CITIES)) as executor:
+        futures = {city: executor.submit(EventScraper(base_url).get_events, city) for city in CITIES}
+        return {city: f.result() for city, f in futures.items()}, None
+
+def crawl_with_pipeline(base_url):
+    scraper = PipelineEventScraper(base_url)
+    return scraper.get_events_many(CITIES), scraper.last_metrics
+
+def crawl_while_pool_grows(base_url):
+    """
+    Two pipelines at once, the second asking for more parse processes than the
+    first: the pool is replaced while the first one is still submitting to it.
+    """
+    small = PipelineEventScraper(base_url, parse_workers=1)
+    large = PipelineEventScraper(base_url, parse_workers=2)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(small.get_events_many, CITIES)
+        time.sleep(RESPONSE_DELAY * 2)  # its first pages are being parsed
+        second = executor.submit(large.get_events_many, CITIES)
+        return first.result(), second.result()
+
+def bench_pipeline_engine():
+    print(f"🧪 Multi-city crawl: {len(CITIES)} cities, thread engine vs fetch/parse pipeline "
+          f"({PARSE_WORKERS} parse processes)...")
+    server = FixtureServer(load_recorded_events()[:EVENTS], response_delay=RESPONSE_DELAY)
+    base_url = server.start()
+    try:
+        # Start the process pool outside the timed runs
+        crawl_with_pipeline(base_url)
+
+        results = {}
+        for name, crawl in [("threads", crawl_with_threads), ("pipeline", crawl_with_pipeline)]:
+            # Otherwise the second engine would reuse the first one's parsed pages
+            page_validators.clear()
+            EventScraper._page_hints.clear()
+            requests_before = server.requests
+            t0 = time.perf_counter()
+            results[name], metrics = crawl(base_url)
+            elapsed = time.perf_counter() - t0
+            total = sum(len(v) for v in results[name].values())
+            print(f"   {name:9s} {elapsed:5.2f}s, {total} events, {server.requests - requests_before} requests")
+            if metrics:
+                print(f"   📊 parse_time {metrics['parse_time']}s over {metrics['pages_parsed']} pages, "
+                      f"queue_wait {metrics['queue_wait']}s, max_queue_depth {metrics['max_queue_depth']}"
+                      f"/{metrics['queue_depth']}, {metrics['pages_reused']} pages reused")
+
+        print("🧪 Growing the process pool while another crawl uses it...")
+        page_validators.clear()
+        EventScraper._page_hints.clear()
+        first, second = crawl_while_pool_grows(base_url)
+        grown = first == results["threads"] and second == results["threads"]
+        print(f"   {'✅' if grown else '❌'} {sum(len(v) for v in first.values())} and "
+              f"{sum(len(v) for v in second.values())} events")
+    finally:
+        server.stop()
+
+    same = results["threads"] == results["pipeline"] and all(results["threads"].values())
+    print("✅ Both engines returned identical events" if same else "❌ Engines returned different events")
+    return same and grown
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_pipeline_engine() else 1)
@@ -0,0 +1,52 @@
+import os
+import sys
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from scrapers.event_scraper import EventScraper
+from scrapers import ld_json
+
+# Saves real iabilet listing pages into tests/fixtures/pages/, where
+# verify_ld_json.py picks them up. Re-run it when iabilet changes its markup.
+PAGES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'pages')
+
+# (city, page): a first page, a later page, the stand-up listing and one past
+# the end of a listing, which iabilet answers with "nu am gasit evenimente"
+PAGES = [
+    ("sibiu", 1),
+    ("cluj-napoca", 2),
+    ("bucuresti", 1),
+    ("all", 1),
+    ("sibiu", 99),
+]
+
+def fetch_listing_pages():
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    scraper = EventScraper()
+    saved = 0
+    empty = 0
+    for city, page in PAGES:
+        url = scraper.page_url(city, page)
+        try:
+            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"❌ {url}: {e}")
+            continue
+        path = os.path.join(PAGES_DIR, f"iabilet-{city}-page{page}.html")
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        is_empty, bodies = ld_json.extract(response.content)
+        empty += is_empty
+        saved += 1
+        print(f"   ✅ {os.path.basename(path)}: {len(response.content)} bytes, "
+              f"{'empty listing' if is_empty else f'{len(bodies)} ld+json blocks'}")
+
+    print(f"✅ Saved {saved}/{len(PAGES)} pages ({empty} empty) to {PAGES_DIR}" if saved == len(PAGES)
+          else f"❌ Saved {saved}/{len(PAGES)} pages")
+    if saved and not empty:
+        print("⚠️  No empty listing among them: raise the page number of the last entry in PAGES")
+    return saved == len(PAGES)
+
+if __name__ == "__main__":
+    sys.exit(0 if fetch_listing_pages() else 1)
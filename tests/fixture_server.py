@@ -0,0 +1,141 @@
+import glob
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for iabilet.ro listing pages.
+# Pages are rebuilt from the event lists recorded in backend/backend/cache_data,
+# 24 events per page as JSON-LD, followed by a "nu am gasit evenimente" page.
+
+CACHE_DATA = os.path.join(os.path.dirname(__file__), '..', 'backend', 'backend', 'cache_data')
+EVENTS_PER_PAGE = 24
+
+def load_recorded_events():
+    events = []
+    seen = set()
+    for path in sorted(glob.glob(os.path.join(CACHE_DATA, 'evt_*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for e in json.load(f):
+                if e.get('url') not in seen:
+                    seen.add(e.get('url'))
+                    events.append(e)
+    return events
+
+def to_ld_json(e):
+    return {
+        "@context": "https://schema.org",
+        "@type": "Event",
+        "name": e['title'],
+        "startDate": e['start_date'],
+        "endDate": e['end_date'],
+        "location": {"@type": "Place", "name": e['location']},
+        "url": e['url'],
+        "image": [e['image']] if e['image'] else [],
+        "offers": {"@type": "Offer", "price": e['price'], "priceCurrency": "RON"},
+    }
+
+def render_page(events):
+    if not events:
+        return ("<html><head><title>iabilet</title></head><body>"
+                "<div class=\"alert\">Ne pare rău, nu am gasit evenimente.</div></body></html>")
+    parts = ["<html><head><title>iabilet</title></head><body><div class=\"event-list\">"]
+    for e in events:
+        parts.append(f"<div class=\"event-list-item\"><a href=\"{e['url']}\">{e['title']}</a></div>")
+        parts.append("<script type=\"application/ld+json\">/*<![CDATA[*/"
+                     + json.dumps(to_ld_json(e)) + "/*]]>*/</script>")
+    parts.append("</div></body></html>")
+    return "".join(parts)
+
+def build_pages(events, per_page=EVENTS_PER_PAGE):
+    """Returns {page_number: html bytes}; pages past the end render the empty marker."""
+    pages = {}
+    for i in range(0, len(events), per_page):
+        pages[i // per_page + 1] = render_page(events[i:i + per_page]).encode('utf-8')
+    return pages
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connection bursts, and every dropped SYN costs the client a 1s retry
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive connections mid-read are expected here
+        pass
+
+class FixtureServer:
+    """
+    Serves /bilete-in-<city>/?page=N and /bilete-stand-up-comedy/?page=N.
+    handshake_delay emulates the TCP+TLS setup cost paid once per new connection.
+    etags=True makes it answer If-None-Match with 304 like a validating server.
+    """
+    def __init__(self, events=None, handshake_delay=0.0, response_delay=0.0, etags=False):
+        self.pages = build_pages(events if events is not None else load_recorded_events())
+        self.empty_page = render_page([]).encode('utf-8')
+        self.handshake_delay = handshake_delay
+        self.response_delay = response_delay
+        self.etags = etags
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; don't let Nagle delay the body
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with fixture._lock:
+                    fixture.connections += 1
+                if fixture.handshake_delay:
+                    time.sleep(fixture.handshake_delay)
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests += 1
+                if fixture.response_delay:
+                    time.sleep(fixture.response_delay)
+                query = parse_qs(urlparse(self.path).query)
+                page = int(query.get('page', ['1'])[0])
+                body = fixture.pages.get(page, fixture.empty_page)
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if fixture.etags and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if fixture.etags:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self._server = _QuietServer(('127.0.0.1', 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# Keep the module-level venue_store (imported by every writer) off the real DB
+os.environ.setdefault("VENUE_DB_PATH", os.path.join(tempfile.gettempdir(), 'stress_venues_default.db'))
+
+WRITERS = 6  # stand-ins for gunicorn workers
+BATCHES = 20
+OWN_VENUES = 10  # per batch, only this writer sees them
+SHARED_VENUES = 5  # per batch, every writer sees the same ones
+CITIES = ['bucuresti', 'cluj-napoca', 'sibiu']
+
+def venue_name(*parts):
+    # Unrelated words, so the near-duplicate matching never merges two test venues
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"{digest[:8]} {digest[8:16]}"
+
+def events_for(writer, batch):
+    events = [{'location': venue_name('own', writer, batch, i)} for i in range(OWN_VENUES)]
+    for i in range(SHARED_VENUES):
+        name = venue_name('shared', batch, i)
+        # Half the writers see the shared venues spelled differently
+        if writer % 2:
+            name = f"Club {name.upper()}"
+        events.append({'location': name, 'location_url': f"https://example.com/{batch}/{i}"})
+    return events
+
+def writer(path, writer_id, start):
+    from venue_store import VenueStore
+    store = VenueStore(path, flush_interval=0.05, seed_file=None)
+    start.wait()
+    for batch in range(BATCHES):
+        for city in CITIES:
+            store.add_venues_from_events(city, events_for(writer_id, batch))
+        if batch % 3 == 0:
+            store.flush()  # mix explicit flushes with the background flusher
+        time.sleep(0.01)
+    store.close()
+
+def stress_venue_store():
+    print(f"🧪 {WRITERS} writer processes x {BATCHES} batches x {len(CITIES)} cities into one SQLite venue store...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'venues.db')
+        ctx = multiprocessing.get_context('spawn')
+        start = ctx.Event()
+        procs = [ctx.Process(target=writer, args=(path, w, start)) for w in range(WRITERS)]
+        for p in procs:
+            p.start()
+        time.sleep(1)  # let every writer import and open the DB
+        t0 = time.perf_counter()
+        start.set()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        failed = [p.exitcode for p in procs if p.exitcode != 0]
+        if failed:
+            print(f"❌ {len(failed)} writers crashed (exit codes {failed})")
+            return False
+
+        from venue_store import VenueStore
+        from venue_index import VenueIndex
+        store = VenueStore(path, seed_file=None)
+        expected = {e['location'] for b in range(BATCHES) for w in (0, 1) for e in events_for(w, b)}
+        expected |= {e['location'] for w in range(WRITERS) for b in range(BATCHES) for e in events_for(w, b)[:OWN_VENUES]}
+        expected_count = (WRITERS * OWN_VENUES + SHARED_VENUES) * BATCHES
+        ok = True
+        for city in CITIES:
+            venues = store.get_venues(city)
+            index = VenueIndex(city, venues, deduped=True)
+            lost = [name for name in expected if index.match(name) is None]
+            dupes = len(venues) - expected_count
+            status = "✅" if not lost and dupes == 0 else "❌"
+            ok = ok and status == "✅"
+            print(f"   {status} {city}: {len(venues)}/{expected_count} venues, {len(lost)} lost, {max(dupes, 0)} duplicates")
+        print(f"   {store.stats()} in {elapsed:.2f}s")
+        print("✅ No venue lost or duplicated across processes" if ok else "❌ Venues were lost or duplicated")
+        return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if stress_venue_store() else 1)
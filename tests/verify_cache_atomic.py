@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+WRITERS = 3
+READERS = 3
+DURATION = 3  # seconds of parallel load per mode
+KEY = 'torn-test'
+
+def payload(writer, round_no):
+    # Sizes vary a lot between writes, so a torn read mixes two very different files
+    count = 200 + (writer * 7919 + round_no * 104729) % 4000
+    return {"writer": writer, "round": round_no, "count": count,
+            "events": [{"title": f"Event {i}", "url": f"https://example.com/{writer}/{round_no}/{i}"}
+                       for i in range(count)]}
+
+def naive_save(cache, data):
+    # What save_to_cache used to do: write the final path in place
+    filepath = os.path.join(cache.backend.directory, cache.get_cache_key('evt', KEY))
+    with open(filepath, 'wb') as f:
+        f.write(json.dumps(data).encode('utf-8'))
+
+def writer(cache_dir, mode, writer_id, deadline):
+    import cache
+    from cache_backends import FileBackend
+    cache.set_backend(FileBackend(cache_dir))
+    round_no = 0
+    while time.time() < deadline:
+        data = payload(writer_id, round_no)
+        if mode == 'atomic':
+            cache.save_to_cache('evt', KEY, data)
+        else:
+            naive_save(cache, data)
+        round_no += 1
+
+def reader(cache_dir, deadline, results):
+    import cache
+    from cache_backends import FileBackend
+    cache.set_backend(FileBackend(cache_dir))
+    reads = torn = misses = 0
+    filepath = os.path.join(cache_dir, cache.get_cache_key('evt', KEY))
+    while time.time() < deadline:
+        # Straight from disk, as another worker without a memory copy would
+        try:
+            with open(filepath, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            misses += 1
+            continue
+        reads += 1
+        try:
+            # Plain JSON in naive mode, a bundle from save_to_cache
+            data = cache.CachedBody.from_stored(body, 0).data()
+            if len(data["events"]) != data["count"]:
+                torn += 1
+        except ValueError:
+            torn += 1
+    results.put((reads, torn, misses))
+
+def run(mode):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        import cache
+        from cache_backends import FileBackend
+        cache.set_backend(FileBackend(cache_dir))
+        cache.save_to_cache('evt', KEY, payload(0, 0))
+
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        deadline = time.time() + DURATION + 1  # + time for the children to start
+        procs = [ctx.Process(target=writer, args=(cache_dir, mode, w, deadline)) for w in range(WRITERS)]
+        procs += [ctx.Process(target=reader, args=(cache_dir, deadline, results)) for _ in range(READERS)]
+        for p in procs:
+            p.start()
+        totals = [0, 0, 0]
+        for _ in range(READERS):
+            for i, n in enumerate(results.get()):
+                totals[i] += n
+        for p in procs:
+            p.join()
+        leftovers = [n for n in os.listdir(cache_dir) if n.endswith(cache.TMP_SUFFIX)]
+        return totals, leftovers
+
+def verify_cache_atomic():
+    print(f"🧪 {WRITERS} writer and {READERS} reader processes on one cache entry for {DURATION}s per mode...")
+    (reads, torn, misses), _ = run('naive')
+    print(f"   in-place writes: {reads} reads, {torn} torn, {misses} missing")
+    (reads, torn, misses), leftovers = run('atomic')
+    print(f"   save_to_cache:   {reads} reads, {torn} torn, {misses} missing, {len(leftovers)} temp files left")
+
+    ok = reads > 0 and torn == 0 and misses == 0 and not leftovers
+    print("✅ Readers never saw a torn or missing entry" if ok else "❌ Readers saw torn or missing entries")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_cache_atomic() else 1)
@@ -0,0 +1,102 @@
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from scrapers.event_scraper import parse_page, parse_page_soup
+from fixture_server import load_recorded_events, build_pages, render_page
+
+# Real iabilet pages (*.html, saved by fetch_listing_pages.py) are added to the corpus
+SAVED_PAGES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'pages')
+BENCH_SECONDS = 2.0
+
+EDGE_CASES = {
+    "marker split by tags": b"<html><body><p>Nu am <b>gasit</b> evenimente</p></body></html>",
+    "marker only inside a script": (
+        b"<html><body><script>var msg = 'nu am gasit evenimente';</script>"
+        + render_page(load_recorded_events()[:2]).encode('utf-8') + b"</body></html>"
+    ),
+    "marker only inside a comment": (
+        b"<!-- nu am gasit evenimente -->" + render_page(load_recorded_events()[:2]).encode('utf-8')
+    ),
+    "ld+json inside a comment": (
+        b"<html><!-- <script type=\"application/ld+json\">{\"@type\": \"Event\", \"name\": \"x\"}</script> --></html>"
+    ),
+    "single quotes and list payload": (
+        b"<script type='application/ld+json'>[{\"@type\": \"Event\", \"name\": \"A\", \"location\": {}},"
+        b" {\"@type\": \"Place\"}]</script>"
+    ),
+    "other script types": (
+        b"<script type=\"text/javascript\">{\"@type\": \"Event\"}</script>"
+        b"<SCRIPT TYPE=\"application/ld+json\">{\"@type\": \"Event\", \"name\": \"B\", \"location\": {}}</SCRIPT>"
+    ),
+    "'>' inside a quoted attribute": (
+        b"<script data-x=\"a>b\" type=\"application/ld+json\">{\"@type\": \"Event\", \"name\": \"C\", \"location\": {}}</script>"
+    ),
+    "type inside another attribute": (
+        b"<script data-type=\"application/ld+json\" title='type=application/ld+json'>{\"@type\": \"Event\", \"name\": \"D\"}</script>"
+    ),
+    "entities in text": b"<p>nu am g&#97;sit evenimente</p>",
+    "broken json": b"<script type=\"application/ld+json\">{not json</script>",
+}
+
+def load_corpus():
+    corpus = {}
+    for page, body in build_pages(load_recorded_events()).items():
+        corpus[f"fixture page {page}"] = body
+    corpus["fixture empty page"] = render_page([]).encode('utf-8')
+    for path in sorted(glob.glob(os.path.join(SAVED_PAGES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            corpus[os.path.basename(path)] = f.read()
+    corpus.update(EDGE_CASES)
+    return corpus
+
+def pages_per_second(parse, pages):
+    count = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < BENCH_SECONDS:
+        for body in pages:
+            parse(body, False)
+        count += len(pages)
+    return count / (time.perf_counter() - t0)
+
+def verify_ld_json():
+    print("🧪 Comparing fast ld+json extraction with BeautifulSoup...")
+    corpus = load_corpus()
+    ok = True
+    mismatches = 0
+    for name, body in corpus.items():
+        for is_global in (False, True):
+            if parse_page(body, is_global) != parse_page_soup(body, is_global):
+                mismatches += 1
+                print(f"❌ Mismatch on '{name}' (is_global={is_global})")
+    if mismatches:
+        print(f"❌ {mismatches} mismatches on {len(corpus)} pages")
+        ok = False
+    else:
+        print(f"✅ Identical event dicts on all {len(corpus)} pages")
+
+    # The fixtures are rendered by fixture_server; only saved pages show iabilet's real markup
+    saved = {name: body for name, body in corpus.items() if name.endswith('.html')}
+    empty = [name for name, body in saved.items() if parse_page_soup(body, False) == []]
+    with_events = len(saved) - len(empty)
+    if not saved:
+        print(f"❌ No real pages in {SAVED_PAGES_DIR}: run fetch_listing_pages.py and commit them")
+        ok = False
+    elif not empty or not with_events:
+        print(f"❌ Real pages need both listings and an empty page: {with_events} with events, {len(empty)} empty")
+        ok = False
+    else:
+        print(f"✅ {len(saved)} real pages checked ({with_events} with events, {len(empty)} empty)")
+
+    print("⏱️  Single-core throughput on fixture pages...")
+    pages = [body for name, body in corpus.items() if name.startswith("fixture page")]
+    soup_rate = pages_per_second(parse_page_soup, pages)
+    fast_rate = pages_per_second(parse_page, pages)
+    print(f"   BeautifulSoup: {soup_rate:8.1f} pages/s")
+    print(f"   fast path:     {fast_rate:8.1f} pages/s ({fast_rate / soup_rate:.1f}x)")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_ld_json() else 1)
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+import cache
+import prewarmer
+from cache_backends import FileBackend, RedisBackend
+from prewarmer import CachePrewarmer
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+WORKERS = 3
+RUN_SECONDS = 2.0
+CITIES = [{"slug": "sibiu"}]
+
+def recording_fetchers(log_path):
+    """Fetchers that only append 'pid' to log_path, so every cycle plans the same refreshes again."""
+    def fetch(city):
+        with open(log_path, 'a') as f:
+            f.write(f"{os.getpid()}\n")
+    return {"evt": fetch, "loc": fetch}
+
+def read_pids(log_path):
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path) as f:
+        return [int(line) for line in f]
+
+def fork_workers(run):
+    """Forks WORKERS children that run run() for RUN_SECONDS, like gunicorn workers."""
+    children = []
+    for _ in range(WORKERS):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run()
+                time.sleep(RUN_SECONDS)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+def verify_workers(tmp):
+    """Each worker imports the app (and starts a prewarmer) after the fork: one of them is elected."""
+    log_path = os.path.join(tmp, 'workers.log')
+    cache.set_backend(FileBackend(os.path.join(tmp, 'cache_data')))
+    fork_workers(lambda: CachePrewarmer(CITIES, recording_fetchers(log_path)).start())
+    workers = set(read_pids(log_path))
+    good = len(workers) == 1
+    print(f"   {'✅' if good else '❌'} {len(workers)}/{WORKERS} workers prewarmed")
+    return good
+
+def verify_preloaded_workers(tmp):
+    """
+    gunicorn --preload: the prewarmer starts in the master, then the workers are
+    forked. The master keeps prewarming; the forks (like any other fork of the
+    process) don't start a second one.
+    """
+    log_path = os.path.join(tmp, 'preload.log')
+    cache.set_backend(FileBackend(os.path.join(tmp, 'cache_data')))
+    warmer = CachePrewarmer(CITIES, recording_fetchers(log_path))
+    warmer.start()
+    time.sleep(0.3)  # the master's first cycle
+
+    master = os.getpid()
+    before = len(read_pids(log_path))
+    fork_workers(lambda: None)
+    warmer.stop()
+    pids = read_pids(log_path)
+    after_fork = pids[before:]
+    workers = {pid for pid in pids if pid != master}
+    good = not workers and bool(after_fork) and set(after_fork) == {master}
+    print(f"   {'✅' if good else '❌'} master refreshed {len(after_fork)} entries after the forks, "
+          f"{len(workers)}/{WORKERS} workers prewarmed")
+    return good
+
+def verify_shared_nodes():
+    """Shared backend: one cycle per interval across every node."""
+    cache.set_backend(RedisBackend(fakeredis.FakeRedis(server=fakeredis.FakeServer()), prefix='test:'))
+    nodes = [CachePrewarmer(CITIES, {"evt": lambda city: None, "loc": lambda city: None}) for _ in range(WORKERS)]
+    reports = [node.run_once() for node in nodes]
+    leaders = sum(node.leader for node in nodes)
+    good = leaders == 1 and sum('skipped' in r for r in reports) == WORKERS - 1
+    print(f"   {'✅' if good else '❌'} {leaders}/{WORKERS} nodes ran the cycle")
+    return good
+
+def verify_prewarm_election():
+    prewarmer.PREWARM_INTERVAL = 0.5
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🧪 {WORKERS} workers each starting a prewarmer (file backend)...")
+        ok = verify_workers(tmp) and ok
+        print(f"🧪 Prewarmer started before forking {WORKERS} workers (--preload)...")
+        ok = verify_preloaded_workers(tmp) and ok
+
+    print(f"🧪 {WORKERS} nodes on one Redis backend...")
+    if fakeredis is None:
+        print("⚠️  fakeredis is not installed (pip install fakeredis), skipping")
+    else:
+        ok = verify_shared_nodes() and ok
+
+    print("✅ One prewarmer spends the budget per deployment" if ok else "❌ Prewarmer election failed")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_prewarm_election() else 1)
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import threading
+import importlib.util
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+NODES = 4
+REQUESTS_PER_NODE = 3
+FETCH_TIME = 0.3  # seconds a fake scrape takes
+REVALIDATE_INTERVAL = 0.2  # seconds a memory copy is trusted without asking the backend
+
+def start_node(server, index):
+    """A fresh copy of cache.py, as a separate instance would have, talking to the shared fake server."""
+    spec = importlib.util.spec_from_file_location(f"cache_node{index}", os.path.join(BACKEND_DIR, 'cache.py'))
+    node = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(node)
+    from cache_backends import RedisBackend
+    node.set_backend(RedisBackend(fakeredis.FakeRedis(server=server), prefix='test:'))
+    node.CACHE_REVALIDATE_INTERVAL = REVALIDATE_INTERVAL
+    return node
+
+def verify_shared_cache():
+    if fakeredis is None:
+        print("⚠️  fakeredis is not installed (pip install fakeredis), skipping")
+        return True
+
+    server = fakeredis.FakeServer()
+    nodes = [start_node(server, i) for i in range(NODES)]
+    ok = True
+
+    print("🧪 Entry saved on one node is served by the others...")
+    nodes[0].save_to_cache('evt', 'sibiu', [{"title": "Concert"}])
+    seen = [node.get_cached_entry('evt', 'sibiu') for node in nodes[1:]]
+    good = all(data == [{"title": "Concert"}] and status == 'fresh' for data, status in seen)
+    print(f"   {'✅' if good else '❌'} {sum(s == 'fresh' for _, s in seen)}/{NODES - 1} nodes hit")
+    ok = ok and good
+
+    print(f"🧪 {NODES} nodes x {REQUESTS_PER_NODE} concurrent misses for the same city...")
+    fetches = []
+    def fetch_on(node):
+        def fetch():
+            fetches.append(node.__name__)
+            time.sleep(FETCH_TIME)
+            data = [{"title": "Festival"}]
+            node.save_to_cache('evt', 'cluj-napoca', data)
+            return data
+        return fetch
+
+    results = []
+    def request(node):
+        results.append(node.get_or_fetch('evt', 'cluj-napoca', fetch_on(node))[0])
+    threads = [threading.Thread(target=request, args=(node,)) for node in nodes for _ in range(REQUESTS_PER_NODE)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    waits = sum(node.get_stats()["shared_waits"] for node in nodes)
+    good = len(fetches) == 1 and len(results) == len(threads) and all(r == [{"title": "Festival"}] for r in results)
+    print(f"   {'✅' if good else '❌'} {len(fetches)} fetch for {len(threads)} requests, "
+          f"{waits} nodes waited for another node's result")
+    ok = ok and good
+
+    print("🧪 A node that dies holding the fetch lock only blocks the others until the lock expires...")
+    for node in nodes:
+        node.FETCH_LOCK_TTL = 1
+    nodes[0].backend.acquire_lock(nodes[0].get_cache_key('evt', 'iasi'), 1)  # and never releases it
+    fetches.clear()
+    t0 = time.perf_counter()
+    data, status = nodes[1].get_or_fetch('evt', 'iasi', fetch_on(nodes[1]))
+    elapsed = time.perf_counter() - t0
+    good = status == 'refetched' and len(fetches) == 1 and elapsed < 3
+    print(f"   {'✅' if good else '❌'} fetched by the next node after {elapsed:.1f}s")
+    ok = ok and good
+
+    print("🧪 Invalidation reaches the shared store...")
+    held, _ = nodes[3].get_cached_entry('evt', 'cluj-napoca')  # now in node 3's memory tier
+    deleted = nodes[2].invalidate(key='cluj-napoca')
+    left = [name for name in nodes[3].backend.names() if name.endswith(nodes[3].get_cache_key('', 'cluj-napoca'))]
+    good = deleted == 1 and not left
+    print(f"   {'✅' if good else '❌'} {deleted} entry deleted, {len(left)} left")
+    ok = ok and good
+
+    print(f"🧪 ...and nodes already holding a memory copy, within {REVALIDATE_INTERVAL}s...")
+    time.sleep(REVALIDATE_INTERVAL)
+    data, status = nodes[3].get_cached_entry('evt', 'cluj-napoca')
+    good = held is not None and data is None and status is None
+    print(f"   {'✅' if good else '❌'} node 3 after invalidation: {status or 'miss'}")
+    ok = ok and good
+
+    print("🧪 A newer entry saved elsewhere replaces a node's memory copy...")
+    nodes[0].save_to_cache('evt', 'sibiu', [{"title": "Opera"}])
+    time.sleep(REVALIDATE_INTERVAL)
+    data, status = nodes[1].get_cached_entry('evt', 'sibiu')  # held since the first check
+    good = data == [{"title": "Opera"}] and status == 'fresh'
+    print(f"   {'✅' if good else '❌'} node 1 serves {data}")
+    ok = ok and good
+
+    print("🧪 Memory hits between revalidations don't touch the backend...")
+    calls = []
+    backend = nodes[1].backend
+    saved_at = backend.saved_at
+    backend.saved_at = lambda name: calls.append(name) or saved_at(name)
+    for _ in range(100):
+        nodes[1].get_cached_response('evt', 'sibiu')
+    good = len(calls) == 0
+    print(f"   {'✅' if good else '❌'} {len(calls)} backend calls for 100 hits")
+    ok = ok and good
+
+    print("✅ Nodes share one warm cache and one set of fetch locks" if ok else "❌ Shared cache checks failed")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_shared_cache() else 1)
@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from venue_index import VenueIndex
+
+CITY = 'bucuresti'
+
+# (known venue, name seen on a listing, same venue?)
+CASES = [
+    ("Control Club", "Club Control", True),
+    ("Club Control", "Control", True),
+    ("Control Club - București", "Control", True),
+    ("Teatrul Național", "Teatrul Nationl", True),
+    ("Sala Palatului", "sala palatului", True),
+    ("Club A", "Club B", False),
+    ("Sala A", "Sala B", False),
+    ("Sala B", "Sala C", False),
+    ("Studio 1", "Studio 2", False),
+    ("Mojo", "Mono", False),
+]
+
+def verify_venue_index():
+    print(f"🧪 Near-duplicate venue matching ({len(CASES)} pairs)...")
+    ok = True
+    for known, seen, same in CASES:
+        index = VenueIndex(CITY, [{"name": known, "url": ""}])
+        matched = index.match(seen) is not None
+        good = matched == same
+        ok = ok and good
+        print(f"   {'✅' if good else '❌'} {known!r} / {seen!r}: {'merged' if matched else 'kept apart'}")
+    print("✅ Same venues merge, distinct ones stay apart" if ok else "❌ Venue matching is wrong")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_venue_index() else 1)